@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class MeetingsConfig(AppConfig):
     name = 'meetings'
+
+    def ready(self):
+        from meetings import checks  # noqa: F401
@@ -1,9 +1,14 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
 from django.utils.translation import ugettext_lazy as _
 from rest_framework import HTTP_HEADER_ENCODING, authentication
 
 from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
 from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.state import User
+from rest_framework_simplejwt.tokens import AccessToken
 
 AUTH_HEADER_TYPES = api_settings.AUTH_HEADER_TYPES
 
@@ -15,6 +20,92 @@ AUTH_HEADER_TYPE_BYTES = set(
     for h in AUTH_HEADER_TYPES
 )
 
+TOKEN_VERSION_CLAIM = 'token_version'
+PERM_VERSION_CLAIM = 'perm_version'
+PERM_CLAIMS = ('level', 'activity_level')
+PRINCIPAL_KEY = 'auth:principal:{}'
+# 进程内缓存，失效操作只作用于当前worker
+LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache')
+
+
+def principal_cache_enabled():
+    """只有配置了多个worker共享的缓存时才缓存已认证用户，否则其他worker无法感知token失效"""
+    return settings.PRINCIPAL_CACHE_TIMEOUT > 0 and settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def cache_principal(user):
+    """按用户id缓存已认证的用户"""
+    cache.set(PRINCIPAL_KEY.format(user.id), user, settings.PRINCIPAL_CACHE_TIMEOUT)
+
+
+def invalidate_principals(*user_ids):
+    """使用户的已认证缓存失效，在signature、token版本或权限变更后调用"""
+    cache.delete_many([PRINCIPAL_KEY.format(user_id) for user_id in user_ids])
+
+
+def issue_access(user):
+    """签发携带用户当前token版本号的access token"""
+    token = AccessToken.for_user(user)
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    token[PERM_VERSION_CLAIM] = user.perm_version
+    for claim in PERM_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return str(token)
+
+
+def bump_token_version(user, **fields):
+    """递增用户的token版本号，使此前签发的token全部失效；fields随同一条UPDATE写入"""
+    current = user.token_version
+    if User.objects.filter(id=user.id, token_version=current).update(token_version=current + 1, signature=None,
+                                                                     **fields):
+        user.token_version = current + 1
+    else:
+        # 并发请求已完成轮换，沿用其版本号
+        if fields:
+            User.objects.filter(id=user.id).update(**fields)
+        user.token_version = User.objects.values_list('token_version', flat=True).get(id=user.id)
+    for field, value in fields.items():
+        setattr(user, field, value)
+    invalidate_principals(user.id)
+
+
+def revoke_permission_claims(*user_ids):
+    """权限变更后递增权限版本号，使token中的权限声明失效"""
+    User.objects.filter(id__in=user_ids).update(perm_version=F('perm_version') + 1)
+    invalidate_principals(*user_ids)
+
+
+def get_permission_claim(request, claim):
+    """权限版本号一致时直接使用token中的权限声明，否则回退到用户记录
+
+    request.user读自数据库或多个worker共享的已认证缓存，后者在revoke_permission_claims时失效，
+    其perm_version即为当前的权限版本号，管理员修改权限后下一次请求即生效。
+    """
+    token = request.auth
+    if token is not None and claim in token and token.get(PERM_VERSION_CLAIM) == request.user.perm_version:
+        return token[claim]
+    return getattr(request.user, claim)
+
+
+def token_needs_rotation(user, token):
+    """token版本号已过时或临近过期时需要轮换"""
+    if token.get(TOKEN_VERSION_CLAIM) != user.token_version:
+        return True
+    return token['exp'] - time.time() < settings.ACCESS_TOKEN_ROTATE_BEFORE.total_seconds()
+
+
+def refresh_access(request):
+    """返回请求可用的access，仅在当前token临近过期时轮换"""
+    user = request.user
+    token = request.auth
+    if token is None or token_needs_rotation(user, token):
+        bump_token_version(user)
+        return issue_access(user)
+    if token.get(PERM_VERSION_CLAIM) != user.perm_version:
+        # 权限已变更，重新签发携带最新权限声明的token
+        return issue_access(user)
+    return str(token)
+
 
 class CustomAuthentication(authentication.BaseAuthentication):
     """
@@ -106,6 +197,17 @@ class CustomAuthentication(authentication.BaseAuthentication):
         except KeyError:
             raise InvalidToken(_('Token contained no recognizable user identification'))
 
+        token_version = validated_token.get(TOKEN_VERSION_CLAIM)
+        # 未携带版本号的旧token需比对signature，不走缓存
+        cacheable = token_version is not None and principal_cache_enabled()
+        if cacheable:
+            user = cache.get(PRINCIPAL_KEY.format(user_id))
+            # 缓存的用户与token版本号不一致时以数据库为准，过时的token在下方被拒绝，
+            # 权限版本号不一致时同样重新读取，保证get_permission_claim比对的是当前的权限版本号
+            if user is not None and user.token_version == token_version and \
+                    user.perm_version == validated_token.get(PERM_VERSION_CLAIM):
+                return user
+
         try:
             user = User.objects.get(**{api_settings.USER_ID_FIELD: user_id})
         except User.DoesNotExist:
@@ -113,8 +215,14 @@ class CustomAuthentication(authentication.BaseAuthentication):
 
         if not user.is_active:
             raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
-        
-        if User.objects.get(id=user_id).signature != str(validated_token):
+
+        if token_version is None:
+            # 兼容未携带版本号的旧token
+            if user.signature != str(validated_token):
+                raise InvalidToken(_('Token has expired'))
+        elif token_version != user.token_version:
             raise InvalidToken(_('Token has expired'))
 
+        if cacheable:
+            cache_principal(user)
         return user
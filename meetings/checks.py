@@ -0,0 +1,163 @@
+import ast
+import os
+from django.apps import apps
+from django.core import checks
+
+# 不参与检查的目录
+SKIP_DIRS = ('migrations', '__pycache__')
+# 查询条件计入索引匹配的方法
+QUERY_METHODS = ('filter', 'get')
+# 链式调用中不增加可走索引条件的方法，exclude为否定条件，无法利用索引定位
+CHAIN_METHODS = ('all', 'exclude', 'order_by', 'select_related', 'prefetch_related', 'annotate', 'values',
+                 'values_list', 'only', 'defer', 'distinct', 'select_for_update')
+# 无法利用B树索引定位的查询条件，不计入索引匹配
+NON_INDEX_LOOKUPS = ('contains', 'icontains', 'iexact', 'istartswith', 'endswith', 'iendswith', 'regex', 'iregex')
+
+
+def get_indexes(model):
+    """模型各索引的列，包括主键、唯一约束、外键、db_index、unique_together、index_together及Meta.indexes"""
+    opts = model._meta
+    indexes = [(opts.pk.name,)]
+    for field in opts.concrete_fields:
+        if field.db_index or field.unique:
+            indexes.append((field.name,))
+    for fields in opts.unique_together + opts.index_together:
+        indexes.append(tuple(fields))
+    for index in opts.indexes:
+        indexes.append(tuple(x.lstrip('-') for x in index.fields))
+    return indexes
+
+
+def is_covered(model, fields):
+    """查询字段组合须与某个索引的前缀一致，或用到某个索引的全部列，其余条件在索引定位后的少量行上过滤"""
+    for columns in get_indexes(model):
+        prefix = []
+        for column in columns:
+            if column not in fields:
+                break
+            prefix.append(column)
+        if not prefix:
+            continue
+        if set(prefix) == fields or len(prefix) == len(columns):
+            return True
+    return False
+
+
+def get_filter_fields(model, keywords):
+    """查询条件涉及的模型字段名，主键统一为pk，不计入模糊匹配等条件，关联查询与无法识别的条件返回None"""
+    opts = model._meta
+    fields = set()
+    for keyword in keywords:
+        if keyword.arg is None:
+            return None
+        parts = keyword.arg.split('__')
+        if len(parts) > 1 and parts[-1] in NON_INDEX_LOOKUPS:
+            continue
+        name = parts[0]
+        if name in ('pk', opts.pk.name, opts.pk.attname):
+            fields.add(opts.pk.name)
+            continue
+        field = next((x for x in opts.concrete_fields if name in (x.name, x.attname)), None)
+        if field is None:
+            return None
+        fields.add(field.name)
+    return fields
+
+
+def get_class_querysets(cls):
+    """视图类的queryset属性及get_queryset的返回值"""
+    querysets = {}
+    for node in cls.body:
+        if isinstance(node, ast.Assign) and any(isinstance(x, ast.Name) and x.id == 'queryset' for x in node.targets):
+            querysets['queryset'] = node.value
+        elif isinstance(node, ast.FunctionDef) and node.name == 'get_queryset':
+            returns = [x for x in ast.walk(node) if isinstance(x, ast.Return) and x.value is not None]
+            if len(returns) == 1:
+                querysets['get_queryset'] = returns[0].value
+    querysets.setdefault('get_queryset', querysets.get('queryset'))
+    return querysets
+
+
+def get_base_name(node):
+    """查询链起点为self.queryset或self.get_queryset()时返回对应名称"""
+    if isinstance(node, ast.Call) and not node.args and not node.keywords:
+        node = node.func
+        name = 'get_queryset'
+    else:
+        name = 'queryset'
+    if isinstance(node, ast.Attribute) and node.attr == name and isinstance(node.value, ast.Name) \
+            and node.value.id == 'self':
+        return name
+    return None
+
+
+def resolve_query(node, models, querysets, depth=0):
+    """解析查询链，返回(模型, 查询字段集合)；起点为Model.objects、self.queryset或self.get_queryset()，无法解析时返回None"""
+    calls = []
+    while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) \
+            and node.func.attr in QUERY_METHODS + CHAIN_METHODS:
+        calls.append(node)
+        node = node.func.value
+    if isinstance(node, ast.Attribute) and node.attr == 'objects' and isinstance(node.value, ast.Name) \
+            and node.value.id in models:
+        model, fields = models[node.value.id], set()
+    else:
+        base = querysets.get(get_base_name(node))
+        resolved = resolve_query(base, models, querysets, depth + 1) if base is not None and depth < 3 else None
+        if not resolved:
+            return None
+        model, fields = resolved
+    for call in calls:
+        if call.func.attr not in QUERY_METHODS:
+            continue
+        call_fields = get_filter_fields(model, call.keywords)
+        if call_fields is None:
+            return None
+        fields |= call_fields
+    return model, fields
+
+
+def iter_queries(path, models):
+    """源文件中的查询链及其模型、查询字段，同一链只取最外层调用，视图类中的链可从queryset/get_queryset开始"""
+    with open(path, 'r', encoding='utf-8') as fp:
+        tree = ast.parse(fp.read(), path)
+    owners = {}
+    for cls in ast.walk(tree):
+        if isinstance(cls, ast.ClassDef):
+            querysets = get_class_querysets(cls)
+            for node in ast.walk(cls):
+                owners[node] = querysets
+    chains = [x for x in ast.walk(tree) if isinstance(x, ast.Call) and isinstance(x.func, ast.Attribute)
+              and x.func.attr in QUERY_METHODS + CHAIN_METHODS]
+    inner = {x.func.value for x in chains}
+    for node in chains:
+        if node in inner:
+            continue
+        resolved = resolve_query(node, models, owners.get(node, {}))
+        if resolved and resolved[1]:
+            yield node, resolved[0], resolved[1]
+
+
+@checks.register(checks.Tags.models)
+def check_query_indexes(app_configs=None, **kwargs):
+    """视图及任务中按条件查询的字段组合须与某个索引的前缀一致，避免数据增长后全表扫描"""
+    app_config = apps.get_app_config('meetings')
+    models = {model.__name__: model for model in app_config.get_models()}
+    errors = []
+    for root, dirs, files in os.walk(app_config.path):
+        dirs[:] = [x for x in dirs if x not in SKIP_DIRS]
+        for filename in files:
+            if not filename.endswith('.py'):
+                continue
+            path = os.path.join(root, filename)
+            for node, model, fields in iter_queries(path, models):
+                if is_covered(model, fields):
+                    continue
+                errors.append(checks.Error(
+                    '{} query filters on {} which no index prefix covers'.format(
+                        model.__name__, ', '.join(sorted(fields))),
+                    hint='add an index starting with these columns to {}.Meta.indexes'.format(model.__name__),
+                    obj='{}:{}'.format(os.path.relpath(path, os.path.dirname(app_config.path)), node.lineno),
+                    id='meetings.E001',
+                ))
+    return errors
@@ -0,0 +1,16 @@
+import datetime
+import logging
+from django.conf import settings
+from django.core.management import BaseCommand
+from meetings.models import IdempotencyKey
+
+logger = logging.getLogger('log')
+
+
+class Command(BaseCommand):
+    """清理超过IDEMPOTENCY_KEY_TTL的幂等键记录，定期执行"""
+
+    def handle(self, *args, **options):
+        expire_time = datetime.datetime.now() - datetime.timedelta(hours=settings.IDEMPOTENCY_KEY_TTL)
+        count, _ = IdempotencyKey.objects.filter(create_time__lt=expire_time).delete()
+        logger.info('cleared {} expired idempotency keys'.format(count))
@@ -1,6 +1,7 @@
 import logging
 import subprocess
 from meetings.models import Group
+from meetings.utils import resource_version
 from django.core.management.base import BaseCommand
 
 logger = logging.getLogger('log')
@@ -36,5 +37,6 @@ class Command(BaseCommand):
                     else:
                         Group.objects.filter(name=sig_name).update(group_type=1, etherpad=etherpad_pre + sig_name)
                         logger.info('Update sig {}'.format(sig_name))
+        resource_version.bump(resource_version.GROUPS)
         logger.info('Done')
 
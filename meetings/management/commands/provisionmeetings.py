@@ -0,0 +1,25 @@
+import logging
+import time
+from django.core.management import BaseCommand
+from meetings.utils.provision import acquire_job, run_job
+
+logger = logging.getLogger('log')
+
+# 无待处理任务时的轮询间隔(秒)
+POLL_INTERVAL = 2
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **options):
+        logger.info('start meeting provisioning worker')
+        while True:
+            try:
+                job = acquire_job()
+                if not job:
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                job = run_job(job)
+                logger.info('meeting job {} finished with status {}'.format(job.id, job.status))
+            except Exception as e:
+                logger.error(e)
+                time.sleep(POLL_INTERVAL)
@@ -23,7 +23,7 @@ def send_subscribe_msg(self):
     access_token = wx_apis.get_token()
     for meeting in meetings:
         topic = meeting.topic
-        start_time = meeting.start
+        start_time = meeting.start.strftime('%H:%M')
         meeting_id = meeting.id
         time = date + ' ' + start_time
         mid = meeting.mid
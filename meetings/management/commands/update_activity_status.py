@@ -1,6 +1,7 @@
 import datetime
 import logging
 from meetings.models import Activity
+from meetings.utils.calendars import invalidate_activity_calendar
 from django.core.management import BaseCommand
 
 logger = logging.getLogger('log')
@@ -9,10 +10,12 @@ logger = logging.getLogger('log')
 def update_activity_status():
     logger.info('start to update activity status')
     activities = Activity.objects.filter(is_delete=0, status__in=[3, 4, 5])
-    today = datetime.date.today().strftime('%Y-%m-%d')
+    today = datetime.date.today()
+    updated_dates = []
     for activity in activities:
         if activity.start_date == today and activity.status == 3:
-            Activity.objects.filter(id=activity.id).update(status=4)
+            Activity.objects.filter(id=activity.id).update(status=4, update_time=datetime.datetime.now())
+            updated_dates.append(activity.start_date)
             logger.info(
                 '\nid: {0}\nstart_date: {1}\ntitle: {2}\nsponsor: {3}'.format(activity.id,
                                                                               activity.start_date,
@@ -20,13 +23,15 @@ def update_activity_status():
                                                                               activity.user.gitee_name))
             logger.info('update activity status from publishing to going.')
         if activity.end_date < today and activity.status == 4:
-            Activity.objects.filter(id=activity.id).update(status=5)
+            Activity.objects.filter(id=activity.id).update(status=5, update_time=datetime.datetime.now())
+            updated_dates.append(activity.start_date)
             logger.info(
                 '\nid: {0}\nend_date: {1}\ntitle: {2}\nsponsor: {3}'.format(activity.id,
                                                                             activity.end_date,
                                                                             activity.title,
                                                                             activity.user.gitee_name))
             logger.info('update activity status from going to completed.')
+    invalidate_activity_calendar(*updated_dates)
     logger.info('All done. Waiting for next task...')
 
 
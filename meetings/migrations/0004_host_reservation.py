@@ -0,0 +1,36 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0003_user_perm_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingHost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20, verbose_name='第三方会议平台')),
+                ('host_id', models.CharField(max_length=128, verbose_name='host_id')),
+            ],
+            options={
+                'unique_together': {('platform', 'host_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='HostReservation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField(verbose_name='开始时间')),
+                ('end_time', models.DateTimeField(verbose_name='结束时间')),
+                ('expire_time', models.DateTimeField(verbose_name='过期时间')),
+                ('create_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('host', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='meetings.MeetingHost')),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0004_host_reservation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.SmallIntegerField(choices=[(1, '创建会议'), (2, '取消会议')], verbose_name='任务类型')),
+                ('status', models.SmallIntegerField(choices=[(0, '待处理'), (1, '处理中'), (2, '成功'), (3, '失败')], default=0, verbose_name='状态')),
+                ('record', models.CharField(blank=True, max_length=20, null=True, verbose_name='录制方式')),
+                ('attempts', models.SmallIntegerField(default=0, verbose_name='已尝试次数')),
+                ('error', models.CharField(blank=True, max_length=255, null=True, verbose_name='失败原因')),
+                ('next_run_time', models.DateTimeField(blank=True, null=True, verbose_name='下次执行时间')),
+                ('create_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('update_time', models.DateTimeField(blank=True, null=True, verbose_name='更新时间')),
+                ('meeting', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='meetings.Meeting')),
+            ],
+        ),
+    ]
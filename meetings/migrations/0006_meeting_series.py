@@ -0,0 +1,32 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0005_meeting_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingSeries',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(max_length=128, verbose_name='会议主题')),
+                ('rrule', models.CharField(max_length=255, verbose_name='重复规则')),
+                ('notified', models.BooleanField(default=False, verbose_name='已发送邀请')),
+                ('create_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to='meetings.Group')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='meetings.MeetingSeries'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0006_meeting_series'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hostreservation',
+            name='meeting',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='meetings.Meeting'),
+        ),
+        migrations.AlterField(
+            model_name='hostreservation',
+            name='expire_time',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='过期时间'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+import datetime
+from django.db import migrations
+
+
+def parse_interval(date, start, end):
+    """将字符串格式的会议日期及起止时间转为起止时间，结束时间不晚于开始时间时视为跨越午夜，格式错误时返回None"""
+    try:
+        start_time = datetime.datetime.strptime('{} {}'.format(date.strip(), start.strip()), '%Y-%m-%d %H:%M')
+        end_time = datetime.datetime.strptime('{} {}'.format(date.strip(), end.strip()), '%Y-%m-%d %H:%M')
+    except (AttributeError, ValueError):
+        return None
+    if end_time <= start_time:
+        end_time += datetime.timedelta(days=1)
+    return start_time, end_time
+
+
+def backfill_host_occupancy(apps, schema_editor):
+    """为已有的未来会议登记host占用，分配host时才能避开占用表上线前预定的会议"""
+    Meeting = apps.get_model('meetings', 'Meeting')
+    MeetingHost = apps.get_model('meetings', 'MeetingHost')
+    HostReservation = apps.get_model('meetings', 'HostReservation')
+    since = (datetime.date.today() - datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+    hosts = {}
+    reservations = []
+    meetings = Meeting.objects.filter(is_delete=0, date__gte=since, hostreservation__isnull=True).exclude(
+        host_id__isnull=True).exclude(host_id='')
+    for meeting in meetings.iterator():
+        interval = parse_interval(meeting.date, meeting.start, meeting.end)
+        if not interval:
+            continue
+        key = ((meeting.mplatform or 'tencent').lower(), meeting.host_id)
+        if key not in hosts:
+            hosts[key], _ = MeetingHost.objects.get_or_create(platform=key[0], host_id=key[1])
+        reservations.append(HostReservation(host=hosts[key], meeting=meeting, start_time=interval[0],
+                                            end_time=interval[1], expire_time=None))
+    HostReservation.objects.bulk_create(reservations)
+
+
+def clear_host_occupancy(apps, schema_editor):
+    HostReservation = apps.get_model('meetings', 'HostReservation')
+    HostReservation.objects.filter(meeting__isnull=False).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0007_host_reservation_meeting'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_host_occupancy, clear_host_occupancy),
+    ]
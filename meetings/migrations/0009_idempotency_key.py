@@ -0,0 +1,31 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0008_backfill_host_occupancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, verbose_name='幂等键')),
+                ('path', models.CharField(max_length=255, verbose_name='请求路径')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='请求指纹')),
+                ('status_code', models.SmallIntegerField(blank=True, null=True, verbose_name='响应状态码')),
+                ('response', models.TextField(blank=True, null=True, verbose_name='响应内容')),
+                ('create_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'key', 'path')},
+            },
+        ),
+    ]
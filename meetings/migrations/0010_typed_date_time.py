@@ -0,0 +1,204 @@
+import datetime
+from django.db import migrations, models
+
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y%m%d')
+TIME_FORMATS = ('%H:%M', '%H:%M:%S', '%H%M')
+
+
+def parse(value, formats):
+    value = (value or '').strip()
+    for fmt in formats:
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def get_duration(start, end):
+    """会议时长(分钟)，结束时间不晚于开始时间时视为跨越午夜"""
+    minutes = (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+    return minutes if minutes > 0 else minutes + 24 * 60
+
+
+def check_strings(apps, schema_editor):
+    """修改表结构前检查所有日期、时间字符串均可解析"""
+    Meeting = apps.get_model('meetings', 'Meeting')
+    Activity = apps.get_model('meetings', 'Activity')
+    errors = []
+    for meeting in Meeting.objects.values('id', 'date', 'start', 'end').iterator():
+        if not parse(meeting['date'], DATE_FORMATS) or not parse(meeting['start'], TIME_FORMATS) or \
+                not parse(meeting['end'], TIME_FORMATS):
+            errors.append('meeting {}: {} {}-{}'.format(meeting['id'], meeting['date'], meeting['start'],
+                                                        meeting['end']))
+    for activity in Activity.objects.values('id', 'start_date', 'end_date').iterator():
+        if not parse(activity['start_date'], DATE_FORMATS) or not parse(activity['end_date'], DATE_FORMATS):
+            errors.append('activity {}: {} - {}'.format(activity['id'], activity['start_date'], activity['end_date']))
+    if errors:
+        raise ValueError('fix the following rows before migrating:\n' + '\n'.join(errors))
+
+
+def strings_to_values(apps, schema_editor):
+    Meeting = apps.get_model('meetings', 'Meeting')
+    Activity = apps.get_model('meetings', 'Activity')
+    for meeting in Meeting.objects.only('id', 'date', 'start', 'end').iterator():
+        start = parse(meeting.start, TIME_FORMATS).time()
+        end = parse(meeting.end, TIME_FORMATS).time()
+        Meeting.objects.filter(id=meeting.id).update(date_value=parse(meeting.date, DATE_FORMATS).date(),
+                                                     start_value=start, end_value=end,
+                                                     duration=get_duration(start, end))
+    for activity in Activity.objects.only('id', 'start_date', 'end_date').iterator():
+        Activity.objects.filter(id=activity.id).update(
+            start_date_value=parse(activity.start_date, DATE_FORMATS).date(),
+            end_date_value=parse(activity.end_date, DATE_FORMATS).date())
+
+
+def values_to_strings(apps, schema_editor):
+    Meeting = apps.get_model('meetings', 'Meeting')
+    Activity = apps.get_model('meetings', 'Activity')
+    for meeting in Meeting.objects.only('id', 'date_value', 'start_value', 'end_value').iterator():
+        Meeting.objects.filter(id=meeting.id).update(date=meeting.date_value.strftime('%Y-%m-%d'),
+                                                     start=meeting.start_value.strftime('%H:%M'),
+                                                     end=meeting.end_value.strftime('%H:%M'))
+    for activity in Activity.objects.only('id', 'start_date_value', 'end_date_value').iterator():
+        Activity.objects.filter(id=activity.id).update(start_date=activity.start_date_value.strftime('%Y-%m-%d'),
+                                                       end_date=activity.end_date_value.strftime('%Y-%m-%d'))
+
+
+class Migration(migrations.Migration):
+    """会议日期、起止时间及活动起止日期由字符串改为日期、时间类型，并补全会议时长"""
+
+    dependencies = [
+        ('meetings', '0009_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_strings, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='meeting',
+            name='date_value',
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='start_value',
+            field=models.TimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='end_value',
+            field=models.TimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='start_date_value',
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='end_date_value',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(strings_to_values, values_to_strings),
+        # 允许为空仅用于回滚时以空字符串重建原字段，不改变表结构
+        migrations.AlterField(
+            model_name='meeting',
+            name='date',
+            field=models.CharField(blank=True, max_length=30, verbose_name='会议日期'),
+        ),
+        migrations.AlterField(
+            model_name='meeting',
+            name='start',
+            field=models.CharField(blank=True, max_length=30, verbose_name='会议开始时间'),
+        ),
+        migrations.AlterField(
+            model_name='meeting',
+            name='end',
+            field=models.CharField(blank=True, max_length=30, verbose_name='会议结束时间'),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='start_date',
+            field=models.CharField(blank=True, max_length=30, verbose_name='活动开始日期'),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='end_date',
+            field=models.CharField(blank=True, max_length=30, verbose_name='活动结束日期'),
+        ),
+        migrations.RemoveField(
+            model_name='meeting',
+            name='date',
+        ),
+        migrations.RemoveField(
+            model_name='meeting',
+            name='start',
+        ),
+        migrations.RemoveField(
+            model_name='meeting',
+            name='end',
+        ),
+        migrations.RemoveField(
+            model_name='activity',
+            name='start_date',
+        ),
+        migrations.RemoveField(
+            model_name='activity',
+            name='end_date',
+        ),
+        migrations.RenameField(
+            model_name='meeting',
+            old_name='date_value',
+            new_name='date',
+        ),
+        migrations.RenameField(
+            model_name='meeting',
+            old_name='start_value',
+            new_name='start',
+        ),
+        migrations.RenameField(
+            model_name='meeting',
+            old_name='end_value',
+            new_name='end',
+        ),
+        migrations.RenameField(
+            model_name='activity',
+            old_name='start_date_value',
+            new_name='start_date',
+        ),
+        migrations.RenameField(
+            model_name='activity',
+            old_name='end_date_value',
+            new_name='end_date',
+        ),
+        migrations.AlterField(
+            model_name='meeting',
+            name='date',
+            field=models.DateField(db_index=True, verbose_name='会议日期'),
+        ),
+        migrations.AlterField(
+            model_name='meeting',
+            name='start',
+            field=models.TimeField(verbose_name='会议开始时间'),
+        ),
+        migrations.AlterField(
+            model_name='meeting',
+            name='end',
+            field=models.TimeField(verbose_name='会议结束时间'),
+        ),
+        migrations.AlterField(
+            model_name='meeting',
+            name='duration',
+            field=models.IntegerField(blank=True, null=True, verbose_name='会议时长(分钟)'),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='start_date',
+            field=models.DateField(db_index=True, verbose_name='活动开始日期'),
+        ),
+        migrations.AlterField(
+            model_name='activity',
+            name='end_date',
+            field=models.DateField(verbose_name='活动结束日期'),
+        ),
+    ]
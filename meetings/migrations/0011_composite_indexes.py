@@ -0,0 +1,53 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0010_typed_date_time'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['is_delete', 'status', 'start_date'], name='activity_delete_status_date'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['is_delete', 'status', 'user'], name='activity_delete_status_user'),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['name'], name='group_name'),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['group_type'], name='group_type'),
+        ),
+        migrations.AddIndex(
+            model_name='idempotencykey',
+            index=models.Index(fields=['create_time'], name='idempotency_create_time'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['is_delete', 'date', 'start'], name='meeting_delete_date_start'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['mid'], name='meeting_mid'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['is_delete', 'user'], name='meeting_delete_user'),
+        ),
+        migrations.AddIndex(
+            model_name='record',
+            index=models.Index(fields=['meeting_code'], name='record_meeting_code'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['activity_level'], name='user_activity_level'),
+        ),
+    ]
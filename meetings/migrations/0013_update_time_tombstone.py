@@ -0,0 +1,73 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0012_resource_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resource', models.CharField(max_length=20, verbose_name='资源名称')),
+                ('object_id', models.IntegerField(verbose_name='记录id')),
+                ('delete_time', models.DateTimeField(auto_now_add=True, verbose_name='删除时间')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='update_time',
+            field=models.DateTimeField(auto_now=True, verbose_name='更新时间'),
+        ),
+        migrations.AddField(
+            model_name='activitycollect',
+            name='update_time',
+            field=models.DateTimeField(auto_now=True, verbose_name='更新时间'),
+        ),
+        migrations.AddField(
+            model_name='collect',
+            name='update_time',
+            field=models.DateTimeField(auto_now=True, verbose_name='更新时间'),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='update_time',
+            field=models.DateTimeField(auto_now=True, verbose_name='更新时间'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['update_time', 'id'], name='activity_update_time'),
+        ),
+        migrations.AddIndex(
+            model_name='activitycollect',
+            index=models.Index(fields=['user', 'update_time', 'id'], name='activitycollect_user_update'),
+        ),
+        migrations.AddIndex(
+            model_name='collect',
+            index=models.Index(fields=['user', 'update_time', 'id'], name='collect_user_update_time'),
+        ),
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['update_time', 'id'], name='meeting_update_time'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'resource', 'delete_time', 'id'], name='tombstone_user_resource_time'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['delete_time'], name='tombstone_delete_time'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0013_update_time_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['is_delete', 'group_name', 'date'], name='meeting_delete_group_date'),
+        ),
+    ]
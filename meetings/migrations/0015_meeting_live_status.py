@@ -0,0 +1,37 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0014_meeting_group_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeetingEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=64, unique=True, verbose_name='事件id')),
+                ('event', models.CharField(max_length=40, verbose_name='事件类型')),
+                ('mid', models.CharField(max_length=20, verbose_name='会议id')),
+                ('create_time', models.DateTimeField(auto_now_add=True, verbose_name='接收时间')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='attendee_count',
+            field=models.IntegerField(default=0, verbose_name='入会人次'),
+        ),
+        migrations.AddField(
+            model_name='meeting',
+            name='live_status',
+            field=models.SmallIntegerField(choices=[(0, '未开始'), (1, '进行中'), (2, '已结束')], default=0, verbose_name='会议状态'),
+        ),
+        migrations.AddIndex(
+            model_name='meetingevent',
+            index=models.Index(fields=['create_time'], name='meetingevent_create_time'),
+        ),
+    ]
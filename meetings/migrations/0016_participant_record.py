@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0015_meeting_live_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParticipantRecord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mid', models.CharField(max_length=20, unique=True, verbose_name='会议id')),
+                ('total', models.IntegerField(default=0, verbose_name='参会人数')),
+                ('data', models.TextField(verbose_name='参会者名单')),
+                ('create_time', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meetings', '0016_participant_record'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='meeting',
+            index=models.Index(fields=['is_delete', 'meeting_type', 'date'], name='meeting_delete_type_date'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['is_delete', 'activity_category', 'status'], name='activity_delete_category'),
+        ),
+    ]
@@ -18,6 +18,8 @@ class User(AbstractBaseUser):
     activity_level = models.SmallIntegerField(verbose_name='活动权限', choices=((1, '普通用户'), (2, '授权用户'), (3, '管理员')),
                                               default=1)
     signature = models.CharField(verbose_name='个性签名', max_length=255, blank=True, null=True)
+    token_version = models.IntegerField(verbose_name='token版本', default=0)
+    perm_version = models.IntegerField(verbose_name='权限版本', default=0)
     create_time = models.DateTimeField(verbose_name='创建时间', auto_now_add=True, null=True, blank=True)
     last_login = models.DateTimeField(verbose_name='上次登录时间', auto_now=True, null=True, blank=True)
     name = models.CharField(verbose_name='姓名', max_length=20, null=True, blank=True)
@@ -36,6 +38,11 @@ class User(AbstractBaseUser):
 
     USERNAME_FIELD = 'openid'
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['activity_level'], name='user_activity_level'),
+        ]
+
 
 class Group(models.Model):
     """用户组表"""
@@ -45,6 +52,12 @@ class Group(models.Model):
     etherpad = models.CharField(verbose_name='etherpad', max_length=128, null=True, blank=True)
     create_time = models.DateTimeField(verbose_name='创建时间', auto_now_add=True, null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='group_name'),
+            models.Index(fields=['group_type'], name='group_type'),
+        ]
+
 
 class GroupUser(models.Model):
     """组与用户表"""
@@ -69,6 +82,16 @@ class CityUser(models.Model):
         unique_together = ('city', 'user')
 
 
+class MeetingSeries(models.Model):
+    """系列会议表"""
+    topic = models.CharField(verbose_name='会议主题', max_length=128)
+    rrule = models.CharField(verbose_name='重复规则', max_length=255)
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING)
+    group = models.ForeignKey(Group, on_delete=models.DO_NOTHING)
+    notified = models.BooleanField(verbose_name='已发送邀请', default=False)
+    create_time = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
+
+
 class Meeting(models.Model):
     """会议表"""
     topic = models.CharField(verbose_name='会议主题', max_length=128)
@@ -77,10 +100,10 @@ class Meeting(models.Model):
     group_type = models.SmallIntegerField(verbose_name='组别', choices=((1, 'SIG'), (2, 'MSG'), (3, 'Pro')))
     city = models.CharField(verbose_name='城市', max_length=10, null=True, blank=True)
     sponsor = models.CharField(verbose_name='发起人', max_length=20)
-    date = models.CharField(verbose_name='会议日期', max_length=30)
-    start = models.CharField(verbose_name='会议开始时间', max_length=30)
-    end = models.CharField(verbose_name='会议结束时间', max_length=30)
-    duration = models.IntegerField(verbose_name='会议时长', null=True, blank=True)
+    date = models.DateField(verbose_name='会议日期', db_index=True)
+    start = models.TimeField(verbose_name='会议开始时间')
+    end = models.TimeField(verbose_name='会议结束时间')
+    duration = models.IntegerField(verbose_name='会议时长(分钟)', null=True, blank=True)
     agenda = models.TextField(verbose_name='议程', default='', null=True, blank=True)
     etherpad = models.CharField(verbose_name='etherpad', max_length=255, null=True, blank=True)
     emaillist = models.TextField(verbose_name='邮件列表', null=True, blank=True)
@@ -97,15 +120,80 @@ class Meeting(models.Model):
     mmid = models.CharField(verbose_name='腾讯会议id', max_length=20, null=True, blank=True)
     replay_url = models.CharField(verbose_name='回放地址', max_length=255, null=True, blank=True)
     mplatform = models.CharField(verbose_name='第三方会议平台', max_length=20, null=True, blank=True, default='tencent')
+    series = models.ForeignKey(MeetingSeries, on_delete=models.DO_NOTHING, null=True, blank=True)
+    live_status = models.SmallIntegerField(verbose_name='会议状态', choices=((0, '未开始'), (1, '进行中'), (2, '已结束')),
+                                           default=0)
+    attendee_count = models.IntegerField(verbose_name='入会人次', default=0)
+    update_time = models.DateTimeField(verbose_name='更新时间', auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_delete', 'date', 'start'], name='meeting_delete_date_start'),
+            models.Index(fields=['mid'], name='meeting_mid'),
+            models.Index(fields=['is_delete', 'user'], name='meeting_delete_user'),
+            models.Index(fields=['is_delete', 'group_name', 'date'], name='meeting_delete_group_date'),
+            models.Index(fields=['is_delete', 'meeting_type', 'date'], name='meeting_delete_type_date'),
+            models.Index(fields=['update_time', 'id'], name='meeting_update_time'),
+        ]
+
+
+class MeetingEvent(models.Model):
+    """第三方平台会议事件回调表，按事件id去重"""
+    event_id = models.CharField(verbose_name='事件id', max_length=64, unique=True)
+    event = models.CharField(verbose_name='事件类型', max_length=40)
+    mid = models.CharField(verbose_name='会议id', max_length=20)
+    create_time = models.DateTimeField(verbose_name='接收时间', auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['create_time'], name='meetingevent_create_time'),
+        ]
+
+
+class MeetingHost(models.Model):
+    """会议host表，预占时段时按host加锁"""
+    platform = models.CharField(verbose_name='第三方会议平台', max_length=20)
+    host_id = models.CharField(verbose_name='host_id', max_length=128)
+
+    class Meta:
+        unique_together = ('platform', 'host_id')
+
+
+class HostReservation(models.Model):
+    """host时段占用表，未关联会议的记录为临时预占"""
+    host = models.ForeignKey(MeetingHost, on_delete=models.CASCADE)
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE, null=True, blank=True)
+    start_time = models.DateTimeField(verbose_name='开始时间')
+    end_time = models.DateTimeField(verbose_name='结束时间')
+    expire_time = models.DateTimeField(verbose_name='过期时间', null=True, blank=True)
+    create_time = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
+
+
+class MeetingJob(models.Model):
+    """会议预定/取消任务表"""
+    meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE)
+    action = models.SmallIntegerField(verbose_name='任务类型', choices=((1, '创建会议'), (2, '取消会议')))
+    status = models.SmallIntegerField(verbose_name='状态', choices=((0, '待处理'), (1, '处理中'), (2, '成功'), (3, '失败')),
+                                      default=0)
+    record = models.CharField(verbose_name='录制方式', max_length=20, null=True, blank=True)
+    attempts = models.SmallIntegerField(verbose_name='已尝试次数', default=0)
+    error = models.CharField(verbose_name='失败原因', max_length=255, null=True, blank=True)
+    next_run_time = models.DateTimeField(verbose_name='下次执行时间', null=True, blank=True)
+    create_time = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
+    update_time = models.DateTimeField(verbose_name='更新时间', null=True, blank=True)
 
 
 class Collect(models.Model):
     """用户收藏会议表"""
     meeting = models.ForeignKey(Meeting, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    update_time = models.DateTimeField(verbose_name='更新时间', auto_now=True)
 
     class Meta:
         unique_together = ('meeting', 'user')
+        indexes = [
+            models.Index(fields=['user', 'update_time', 'id'], name='collect_user_update_time'),
+        ]
 
 
 class Feedback(models.Model):
@@ -123,13 +211,26 @@ class Record(models.Model):
     file_size = models.CharField(verbose_name='视频大小', max_length=20)
     download_url = models.CharField(verbose_name='下载地址', max_length=255)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['meeting_code'], name='record_meeting_code'),
+        ]
+
+
+class ParticipantRecord(models.Model):
+    """已结束会议的参会者名单，保存第三方平台返回的原始数据"""
+    mid = models.CharField(verbose_name='会议id', max_length=20, unique=True)
+    total = models.IntegerField(verbose_name='参会人数', default=0)
+    data = models.TextField(verbose_name='参会者名单')
+    create_time = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
+
 
 class Activity(models.Model):
     """活动表"""
     user = models.ForeignKey(User, on_delete=models.DO_NOTHING)
     title = models.CharField(verbose_name='活动标题', max_length=50)
-    start_date = models.CharField(verbose_name='活动开始日期', max_length=30)
-    end_date = models.CharField(verbose_name='活动结束日期', max_length=30)
+    start_date = models.DateField(verbose_name='活动开始日期', db_index=True)
+    end_date = models.DateField(verbose_name='活动结束日期')
     activity_category = models.SmallIntegerField(verbose_name='活动类别',
                                                  choices=((1, '课程'), (2, 'MSG'), (3, '赛事'), (4, '其他')))
     activity_type = models.SmallIntegerField(verbose_name='活动类型', choices=((1, '线下'), (2, '线上'), (3, '线上与线下')))
@@ -151,15 +252,28 @@ class Activity(models.Model):
     create_time = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
     sign_url = models.CharField(verbose_name='签到二维码', max_length=255, null=True, blank=True)
     replay_url = models.CharField(verbose_name='回放地址', max_length=255, null=True, blank=True)
+    update_time = models.DateTimeField(verbose_name='更新时间', auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_delete', 'status', 'start_date'], name='activity_delete_status_date'),
+            models.Index(fields=['is_delete', 'status', 'user'], name='activity_delete_status_user'),
+            models.Index(fields=['is_delete', 'activity_category', 'status'], name='activity_delete_category'),
+            models.Index(fields=['update_time', 'id'], name='activity_update_time'),
+        ]
 
 
 class ActivityCollect(models.Model):
     """活动收藏表"""
     activity = models.ForeignKey(Activity, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    update_time = models.DateTimeField(verbose_name='更新时间', auto_now=True)
 
     class Meta:
         unique_together = ('activity', 'user')
+        indexes = [
+            models.Index(fields=['user', 'update_time', 'id'], name='activitycollect_user_update'),
+        ]
 
 
 class ActivityRegister(models.Model):
@@ -178,3 +292,41 @@ class ActivitySign(models.Model):
 
     class Meta:
         unique_together = ('activity', 'user')
+
+
+class IdempotencyKey(models.Model):
+    """幂等请求记录表"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    key = models.CharField(verbose_name='幂等键', max_length=64)
+    path = models.CharField(verbose_name='请求路径', max_length=255)
+    fingerprint = models.CharField(verbose_name='请求指纹', max_length=64)
+    status_code = models.SmallIntegerField(verbose_name='响应状态码', null=True, blank=True)
+    response = models.TextField(verbose_name='响应内容', null=True, blank=True)
+    create_time = models.DateTimeField(verbose_name='创建时间', auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'key', 'path')
+        indexes = [
+            models.Index(fields=['create_time'], name='idempotency_create_time'),
+        ]
+
+
+class ResourceVersion(models.Model):
+    """资源版本表，资源写入后递增版本号，用于生成ETag与Last-Modified"""
+    name = models.CharField(verbose_name='资源名称', max_length=20, unique=True)
+    version = models.IntegerField(verbose_name='版本号', default=0)
+    update_time = models.DateTimeField(verbose_name='更新时间', auto_now=True)
+
+
+class Tombstone(models.Model):
+    """已物理删除记录表，用于增量同步删除的收藏"""
+    resource = models.CharField(verbose_name='资源名称', max_length=20)
+    object_id = models.IntegerField(verbose_name='记录id')
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    delete_time = models.DateTimeField(verbose_name='删除时间', auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'resource', 'delete_time', 'id'], name='tombstone_user_resource_time'),
+            models.Index(fields=['delete_time'], name='tombstone_delete_time'),
+        ]
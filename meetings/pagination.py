@@ -0,0 +1,35 @@
+from rest_framework.pagination import CursorPagination
+
+
+class OptInCursorPagination(CursorPagination):
+    """游标分页，仅在请求携带cursor或page_size参数时分页，否则返回全部数据
+
+    游标按列表原有的排序生成，列表未指定排序时使用ordering。
+    """
+    ordering = ('id',)
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params and \
+                self.page_size_query_param not in request.query_params:
+            return None
+        if not hasattr(queryset, 'query'):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        if queryset.query.order_by:
+            return tuple(queryset.query.order_by)
+        return self.ordering
+
+
+class MeetingCursorPagination(OptInCursorPagination):
+    """会议列表分页"""
+    ordering = ('-date', 'start')
+
+
+class ActivityCursorPagination(OptInCursorPagination):
+    """活动列表分页"""
+    ordering = ('-start_date', 'id')
@@ -1,6 +1,6 @@
 from django.conf import settings
 from rest_framework import permissions
-from meetings.models import User
+from meetings.auth import get_permission_claim
 
 
 class MaintainerPermission(permissions.IsAuthenticated):
@@ -11,15 +11,10 @@ class MaintainerPermission(permissions.IsAuthenticated):
     def has_permission(self, request, view):
         if request.user.is_anonymous:
             return False
-        if not request.user.level:
-            return False
-        if request.user.level >= self.level:
-            if User.objects.get(id=request.user.id, level=request.user.level):
-                return True
-            else:
-                return False
-        else:
+        level = get_permission_claim(request, 'level')
+        if not level:
             return False
+        return level >= self.level
 
     def has_object_permission(self, request, view, obj):
         return self.has_permission(request, view)
@@ -33,15 +28,10 @@ class SponsorPermission(permissions.IsAuthenticated):
     def has_permission(self, request, view):
         if request.user.is_anonymous:
             return False
-        if not request.user.activity_level:
-            return False
-        if request.user.activity_level >= self.activity_level:
-            if User.objects.get(id=request.user.id, activity_level=request.user.activity_level):
-                return True
-            else:
-                return False
-        else:
+        activity_level = get_permission_claim(request, 'activity_level')
+        if not activity_level:
             return False
+        return activity_level >= self.activity_level
 
     def has_object_permission(self, request, view, obj):
         return self.has_permission(request, view)
@@ -12,7 +12,9 @@ from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from django.conf import settings
-from meetings.models import Meeting
+from meetings.models import Meeting, MeetingSeries
+from meetings.utils import recurrence
+from meetings.utils.host_allocator import meeting_interval
 
 logger = logging.getLogger('log')
 
@@ -21,9 +23,9 @@ def sendmail(mid, record=None, enclosure_paths=None):
     mid = str(mid)
     meeting = Meeting.objects.get(mid=mid)
     topic = meeting.topic
-    date = meeting.date
-    start = meeting.start
-    end = meeting.end
+    date = meeting.date.strftime('%Y-%m-%d')
+    start = meeting.start.strftime('%H:%M')
+    end = meeting.end.strftime('%H:%M')
     join_url = meeting.join_url
     sig_name = meeting.group_name
     toaddrs = meeting.emaillist
@@ -147,3 +149,107 @@ def sendmail(mid, record=None, enclosure_paths=None):
     except smtplib.SMTPException as e:
         logger.error(e)
 
+
+def sendmail_series(series_id):
+    """发送系列会议的合并邀请，日历中以RRULE描述全部会议"""
+    series = MeetingSeries.objects.get(id=series_id)
+    meetings = list(Meeting.objects.filter(series_id=series_id, is_delete=0).exclude(mid='').order_by('date', 'start'))
+    if not meetings:
+        logger.warning('series {} has no provisioned meeting, skip sending invitation'.format(series_id))
+        return
+    first = meetings[0]
+    topic = first.topic
+    sig_name = first.group_name
+    toaddrs = first.emaillist
+    etherpad = first.etherpad
+    platform = first.mplatform.replace('tencent', 'Tencent').replace('welink', 'WeLink')
+    summary = first.agenda or ''
+    if sig_name == 'Tech':
+        sig_name = '专家委员会'
+    if not toaddrs:
+        return
+    toaddrs = toaddrs.replace(' ', '').replace('，', ',').replace(';', ',').replace('；', ',')
+    toaddrs_list = [addr for addr in toaddrs.split(',')
+                    if re.match(r'^[a-zA-Z0-9+_.-]+@[a-zA-Z0-9_-]+(\.[a-zA-Z0-9_-]+)+$', addr)]
+    toaddrs_list = sorted(list(set(toaddrs_list)))
+    toaddrs_string = ','.join(toaddrs_list)
+
+    # 构造邮件
+    msg = MIMEMultipart()
+    occurrences = '\n'.join('{} {}-{}  {}'.format(x.date.strftime('%Y-%m-%d'), x.start.strftime('%H:%M'),
+                                                 x.end.strftime('%H:%M'), x.join_url) for x in meetings)
+    with open('templates/template_series.txt', 'r', encoding='utf-8') as fp:
+        body_of_email = fp.read().replace('{{sig_name}}', sig_name).replace('{{platform}}', platform). \
+            replace('{{topic}}', topic).replace('{{summary}}', summary).replace('{{etherpad}}', etherpad or ''). \
+            replace('{{occurrences}}', occurrences)
+    msg.attach(MIMEText(body_of_email, 'plain', 'utf-8'))
+
+    # 添加日历，未能创建的会议以EXDATE排除
+    def to_utc(dt):
+        return (dt - datetime.timedelta(hours=8)).replace(tzinfo=pytz.utc)
+
+    # 重复规则从系列的第一次会议开始计算，即使该次会议未能创建
+    origin = Meeting.objects.filter(series_id=series_id).order_by('date', 'start').first()
+    local_start, local_end = meeting_interval(origin.date, origin.start, origin.end)
+    provisioned = set(datetime.datetime.combine(x.date, x.start) for x in meetings)
+    rule = icalendar.vRecur.from_ical(recurrence.parse_rule(series.rrule))
+    if 'UNTIL' in rule:
+        until = rule['UNTIL'][0]
+        if not isinstance(until, datetime.datetime):
+            until = datetime.datetime.combine(until, datetime.time(23, 59))
+        rule['UNTIL'] = [to_utc(until.replace(tzinfo=None))]
+
+    cal = icalendar.Calendar()
+    cal.add('prodid', '-//mindspore conference calendar')
+    cal.add('version', '2.0')
+    cal.add('method', 'REQUEST')
+
+    event = icalendar.Event()
+    event.add('attendee', ','.join(toaddrs_list))
+    event.add('summary', topic)
+    event.add('dtstart', to_utc(local_start))
+    event.add('dtend', to_utc(local_end))
+    event.add('dtstamp', to_utc(local_start))
+    event.add('rrule', rule)
+    exdates = [to_utc(x) for x in recurrence.expand(series.rrule, local_start) if x not in provisioned]
+    if exdates:
+        event.add('exdate', exdates)
+    event.add('description', occurrences)
+    event.add('uid', platform + 'series' + str(series_id))
+
+    alarm = icalendar.Alarm()
+    alarm.add('action', 'DISPLAY')
+    alarm.add('description', 'Reminder')
+    alarm.add('TRIGGER;RELATED=START', '-PT15M')
+    event.add_component(alarm)
+
+    cal.add_component(event)
+
+    filename = 'invite.ics'
+    part = MIMEBase('text', 'calendar', method='REQUEST', name=filename)
+    part.set_payload(cal.to_ical())
+    encoders.encode_base64(part)
+    part.add_header('Content-Description', filename)
+    part.add_header('Content-class', 'urn:content-classes:calendarmessage')
+    part.add_header('Filename', filename)
+    part.add_header('Path', filename)
+
+    msg.attach(part)
+
+    sender = settings.DEFAULT_CONF.get('SMTP_SENDER', '')
+    # 完善邮件信息
+    msg['Subject'] = topic
+    msg['From'] = 'MindSpore conference <%s>' % sender
+    msg['To'] = toaddrs_string
+
+    # 登录服务器发送邮件
+    try:
+        server = smtplib.SMTP(settings.SMTP_SERVER_HOST, settings.SMTP_SERVER_PORT)
+        server.ehlo()
+        server.starttls()
+        server.login(settings.GMAIL_USERNAME, settings.GMAIL_PASSWORD)
+        server.sendmail(sender, toaddrs_list, msg.as_string())
+        logger.info('series {} invitation sent: {}'.format(series_id, toaddrs_string))
+        server.quit()
+    except smtplib.SMTPException as e:
+        logger.error(e)
@@ -1,12 +1,14 @@
 import requests
 import logging
 from django.contrib.auth.hashers import make_password
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.db.models import F
 from django.conf import settings
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
+from meetings.auth import invalidate_principals, issue_access, bump_token_version
 from meetings.models import Group, Meeting, Collect, User, GroupUser, Feedback, City, CityUser, Activity, \
     ActivityCollect, ActivityRegister, ActivitySign
+from meetings.sparse import SparseFieldsSerializerMixin
 from meetings.utils import wx_apis
 
 logger = logging.getLogger('log')
@@ -30,30 +32,32 @@ class LoginSerializer(serializers.ModelSerializer):
             if not code:
                 logger.warning('Login without jscode.')
                 raise serializers.ValidationError('需要code', code='code_error')
-            r = wx_apis.get_token()
+            r = wx_apis.get_openid(code)
             if not r.get('openid'):
                 logger.warning('Failed to get openid.')
+                logger.warning('errcode: {}, errmsg: {}'.format(r.get('errcode'), r.get('errmsg')))
                 raise serializers.ValidationError('未获取到openid', code='code_error')
             openid = r['openid']
-            nickname = res['userInfo']['nickName'] if 'nickName' in res['userInfo'] else ''
-            avatar = res['userInfo']['avatarUrl'] if 'avatarUrl' in res['userInfo'] else ''
-            gender = res['userInfo']['gender'] if 'gender' in res['userInfo'] else 0
+            user_info = res['userInfo']
+            profile = {
+                'nickname': user_info.get('nickName', ''),
+                'avatar': user_info.get('avatarUrl', ''),
+                'gender': user_info.get('gender', 0)
+            }
             user = User.objects.filter(openid=openid).first()
             # 如果user不存在，数据库创建user
             if not user:
                 user = User.objects.create(
-                    nickname=nickname,
-                    avatar=avatar,
-                    gender=gender,
-                    gitee_name=nickname,
+                    gitee_name=profile['nickname'],
                     status=1,
                     password=make_password(openid),
-                    openid=openid)
+                    openid=openid,
+                    token_version=1,
+                    **profile)
             else:
-                User.objects.filter(openid=openid).update(
-                    nickname=nickname,
-                    avatar=avatar,
-                    gender=gender)
+                # 仅写入有变化的资料，并与token版本号轮换合并为一条UPDATE
+                changed = {k: v for k, v in profile.items() if getattr(user, k) != v}
+                bump_token_version(user, **changed)
             return user
         except Exception as e:
             logger.error('Invalid params')
@@ -62,15 +66,12 @@ class LoginSerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        refresh = RefreshToken.for_user(instance)
         data['user_id'] = instance.id
-        access = str(refresh.access_token)
-        data['access'] = access
+        data['access'] = issue_access(instance)
         data['level'] = instance.level
         data['gitee_name'] = instance.gitee_name
         data['activity_level'] = instance.activity_level
         data['agree_privacy_policy'] = instance.agree_privacy_policy
-        User.objects.filter(id=instance.id).update(signature=access)
         return data
 
 
@@ -121,7 +122,8 @@ class GroupUserAddSerializer(ModelSerializer):
         try:
             for id in users:
                 groupuser = GroupUser.objects.create(group_id=group_id.id, user_id=int(id.id))
-                User.objects.filter(id=int(id.id), level=1).update(level=2)
+                User.objects.filter(id=int(id.id), level=1).update(level=2, perm_version=F('perm_version') + 1)
+            invalidate_principals(*[user.id for user in users])
             return groupuser
         except Exception as e:
             logger.error('Failed to add maintainers to the group.')
@@ -167,9 +169,10 @@ class CityUserAddSerializer(ModelSerializer):
         try:
             for id in users:
                 cityuser = CityUser.objects.create(city_id=city_id.id, user_id=int(id.id))
-                User.objects.filter(id=int(id.id), level=1).update(level=2)
+                User.objects.filter(id=int(id.id), level=1).update(level=2, perm_version=F('perm_version') + 1)
                 if not GroupUser.objects.filter(group_id=1, user_id=int(id.id)):
                     GroupUser.objects.create(group_id=1, user_id=int(id.id))
+            invalidate_principals(*[user.id for user in users])
             return cityuser
         except Exception as e:
             logger.error('Failed to add activity sponsors.')
@@ -250,23 +253,39 @@ class MeetingDetailSerializer(ModelSerializer):
         fields = '__all__'
 
 
-class MeetingsListSerializer(ModelSerializer):
+def get_collection_ids(request, meeting_ids):
+    """当前用户对指定会议的收藏，返回{meeting_id: collection_id}，匿名用户不查询"""
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated or not meeting_ids:
+        return {}
+    return dict(Collect.objects.filter(user_id=user.pk, meeting_id__in=meeting_ids).values_list('meeting_id', 'id'))
+
+
+class MeetingsListListSerializer(serializers.ListSerializer):
+    """批量序列化会议时一次查询当前用户对所有会议的收藏"""
+
+    def to_representation(self, data):
+        meetings = list(data.all() if hasattr(data, 'all') else data)
+        self.context['collection_ids'] = get_collection_ids(self.context.get('request'),
+                                                            [meeting.id for meeting in meetings])
+        return super().to_representation(meetings)
+
+
+class MeetingsListSerializer(SparseFieldsSerializerMixin, ModelSerializer):
     collection_id = serializers.SerializerMethodField()
 
     class Meta:
         model = Meeting
         fields = ['id', 'collection_id', 'user_id', 'group_id', 'topic', 'sponsor', 'group_name', 'city', 'date', 'start',
-                  'end', 'agenda', 'etherpad', 'mid', 'mmid', 'join_url', 'replay_url', 'mplatform']
+                  'end', 'agenda', 'etherpad', 'mid', 'mmid', 'join_url', 'replay_url', 'mplatform', 'live_status',
+                  'attendee_count']
+        list_serializer_class = MeetingsListListSerializer
 
     def get_collection_id(self, obj):
-        user = None
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            user = request.user
-        try:
-            return Collect.objects.filter(user_id=user.pk, meeting_id=obj.id).values()[0]['id']
-        except IndexError:
-            return
+        collection_ids = self.context.get('collection_ids')
+        if collection_ids is None:
+            collection_ids = get_collection_ids(self.context.get('request'), [obj.id])
+        return collection_ids.get(obj.id)
 
 
 class CollectSerializer(ModelSerializer):
@@ -305,7 +324,7 @@ class ActivityDraftUpdateSerializer(ModelSerializer):
         fields = '__all__'
 
 
-class ActivitiesSerializer(ModelSerializer):
+class ActivitiesSerializer(SparseFieldsSerializerMixin, ModelSerializer):
     collection_id = serializers.SerializerMethodField()
     register_id = serializers.SerializerMethodField()
     register_count = serializers.SerializerMethodField()
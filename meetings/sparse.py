@@ -0,0 +1,50 @@
+from django.core.exceptions import FieldDoesNotExist
+
+FIELDS_QUERY_PARAM = 'fields'
+
+
+class SparseFieldsSerializerMixin:
+    """序列化器只输出context['fields']中的字段，未指定时输出全部字段"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """列表接口支持fields=a,b,c参数，只序列化指定字段，并只查询这些字段、主键及排序字段对应的列"""
+
+    def get_sparse_fields(self):
+        """fields参数中序列化器支持的字段，未指定或全部无效时返回None"""
+        value = self.request.query_params.get(FIELDS_QUERY_PARAM)
+        if not value:
+            return None
+        names = self.get_serializer_class().Meta.fields
+        fields = [name for name in (x.strip() for x in value.split(',')) if name in names]
+        return fields or None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if not fields:
+            return queryset
+        opts = queryset.model._meta
+        ordering = list(queryset.query.order_by) + list(getattr(self.pagination_class, 'ordering', None) or ())
+        columns = {opts.pk.name}
+        for name in fields + [x.lstrip('-') for x in ordering if isinstance(x, str)]:
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                # 按attname(如user_id)指定或SerializerMethodField，后者只依赖主键
+                field = next((x for x in opts.concrete_fields if x.attname == name), None)
+            if field is not None and field.concrete:
+                columns.add(field.name)
+        return queryset.only(*columns)
@@ -8,7 +8,9 @@ from meetings.views import LoginView, GroupMembersView, NonGroupMembersView, Sig
     DraftsListView, ActivityCollectView, ActivityCollectionsView, ActivityCollectionDelView, MyCountsView, \
     CityMembersView, NonCityMembersView, CitiesView, AddCityView, CityUserAddView, CityUserDelView, UserCityView, \
     RecentActivitiesView, PublishedActivitiesView, WaitingPublishingActivitiesView, CountActivitiesView, \
-    MeetingsDataView, ActivitiesDataView, AgreePrivacyPolicyView
+    MeetingsDataView, ActivitiesDataView, AgreePrivacyPolicyView, MeetingJobView, \
+    MeetingSeriesView, AvailabilityView, BulkCancelMeetingView, GroupFeedView, CityFeedView, ActivityFeedView, \
+    ChangesView, MeetingOverviewView
 
 urlpatterns = [
     path('login/', LoginView.as_view()),  # 登录
@@ -21,8 +23,13 @@ urlpatterns = [
     path('usergroup/<int:pk>/', UserGroupView.as_view()),  # 用户的组信息
     path('userinfo/<int:pk>/', UserInfoView.as_view()),  # 查询用户信息
     path('meetings/', CreateMeetingView.as_view()),  # 预定会议
+    path('meetings/series/', MeetingSeriesView.as_view()),  # 预定系列会议
+    path('availability/', AvailabilityView.as_view()),  # 查询空闲时段
     path('meeting/<int:mmid>/', CancelMeetingView.as_view()),  # 取消会议
+    path('meetings/bulk_cancel/', BulkCancelMeetingView.as_view()),  # 批量取消会议
     path('meetings/<int:pk>/', MeetingDetailView.as_view()),  # 会议详情
+    path('meetings/<int:pk>/overview/', MeetingOverviewView.as_view()),  # 会议详情聚合
+    path('meetingjob/<int:pk>/', MeetingJobView.as_view()),  # 会议预定/取消任务状态
     path('meetingslist/', MeetingsListView.as_view()),  # 会议列表
     path('collect/', CollectMeetingView.as_view()),  # 收藏会议
     path('collect/<int:pk>/', CollectionDelView.as_view()),  # 取消收藏会议
@@ -65,5 +72,9 @@ urlpatterns = [
     path('countactivities/', CountActivitiesView.as_view()),  # 各类活动计数
     path('meetingsdata/', MeetingsDataView.as_view()),  # 会议日历数据
     path('activitiesdata/', ActivitiesDataView.as_view()),  # 活动日历数据
+    path('changes/', ChangesView.as_view()),  # 会议、活动及收藏的增量同步
+    path('feeds/group/<int:pk>.ics', GroupFeedView.as_view()),  # 组会议订阅日历
+    path('feeds/city/<int:pk>.ics', CityFeedView.as_view()),  # 城市MSG会议订阅日历
+    path('feeds/activities.ics', ActivityFeedView.as_view()),  # 活动订阅日历
     path('agree/', AgreePrivacyPolicyView.as_view()),  # 同意更新隐私政策
 ]
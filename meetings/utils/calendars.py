@@ -0,0 +1,180 @@
+import datetime
+import json
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from meetings.models import Meeting, Activity
+from meetings.utils import resource_version
+
+logger = logging.getLogger('log')
+
+# 缓存键包含所在月份的版本号，任一worker递增版本后所有worker都不再读取该月旧的缓存
+MEETING_CALENDAR_KEY = 'calendar:meetings:{version}:{month}'
+ACTIVITY_CALENDAR_KEY = 'calendar:activities:{version}:{month}'
+# 按月的日历版本名，如meetings:2030-01，变更只使所在月份的日历缓存失效
+MONTH_VERSION = '{resource}:{month}'
+# 默认查询前后180天
+DEFAULT_WINDOW = datetime.timedelta(days=180)
+# 单次查询最多包含的月数
+MAX_WINDOW_MONTHS = 25
+
+
+def get_window(params):
+    """从查询参数中获取日期范围，支持month=YYYY-MM或start_date/end_date=YYYY-MM-DD，无效时抛出ValueError"""
+    month = params.get('month')
+    if month:
+        first_day = datetime.datetime.strptime(month, '%Y-%m')
+        next_month = (first_day + datetime.timedelta(days=31)).replace(day=1)
+        return first_day.strftime('%Y-%m-%d'), (next_month - datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+    now = datetime.datetime.now()
+    start_date = params.get('start_date') or (now - DEFAULT_WINDOW).strftime('%Y-%m-%d')
+    end_date = params.get('end_date') or (now + DEFAULT_WINDOW).strftime('%Y-%m-%d')
+    datetime.datetime.strptime(start_date, '%Y-%m-%d')
+    datetime.datetime.strptime(end_date, '%Y-%m-%d')
+    if start_date > end_date:
+        raise ValueError('start_date should not be later than end_date')
+    if len(get_months(start_date, end_date)) > MAX_WINDOW_MONTHS:
+        raise ValueError('the window should not exceed {} months'.format(MAX_WINDOW_MONTHS))
+    return start_date, end_date
+
+
+def get_months(start_date, end_date):
+    """日期范围覆盖的月份列表，格式为YYYY-MM"""
+    year, month = int(start_date[:4]), int(start_date[5:7])
+    months = []
+    while '{:04d}-{:02d}'.format(year, month) <= end_date[:7]:
+        months.append('{:04d}-{:02d}'.format(year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def get_month_versions(resource, months):
+    """各月份的日历版本号，返回{month: version}，未变更过的月份版本号为0"""
+    names = {month: MONTH_VERSION.format(resource=resource, month=month) for month in months}
+    versions = resource_version.get_versions(list(names.values()))
+    return {month: versions[names[month]][0] for month in months}
+
+
+def bump_month_versions(resource, dates):
+    """递增变更日期所在月份的日历版本，再递增资源版本；先递增月份版本，读到新资源版本时必然读到新的月份版本"""
+    months = sorted({str(date)[:7] for date in dates if date})
+    if not months:
+        return
+    resource_version.bump(*[MONTH_VERSION.format(resource=resource, month=month) for month in months])
+    resource_version.bump(resource)
+
+
+def get_buckets(key, versions, build):
+    """按月读取各月份版本下的缓存，versions为{month: version}，未命中的月份通过build(months)一次构建后写入缓存"""
+    months = sorted(versions)
+    keys = {month: key.format(version=versions[month], month=month) for month in months}
+    cached = cache.get_many(keys.values())
+    buckets = {month: cached[keys[month]] for month in months if keys[month] in cached}
+    missing = [month for month in months if month not in buckets]
+    if missing:
+        built = build(missing)
+        cache.set_many({keys[month]: built[month] for month in missing}, settings.CALENDAR_CACHE_TIMEOUT)
+        buckets.update(built)
+    return buckets
+
+
+def get_month_range(months):
+    """月份列表对应的日期范围[首月第一天, 末月次月第一天)"""
+    first_day = datetime.datetime.strptime(months[0], '%Y-%m').date()
+    last_month = datetime.datetime.strptime(months[-1], '%Y-%m').date()
+    return first_day, (last_month + datetime.timedelta(days=31)).replace(day=1)
+
+
+def meeting_item(meeting):
+    start, end = meeting['start'], meeting['end']
+    # 结束时间向上取整到整点
+    end_hour = end.hour + 1 if end.minute else end.hour
+    return {
+        'id': meeting['id'],
+        'group_name': meeting['group_name'],
+        'meeting_type': meeting['meeting_type'],
+        'city': meeting['city'],
+        'startTime': start.strftime('%H:%M'),
+        'endTime': end.strftime('%H:%M'),
+        'duration': end_hour - start.hour,
+        'duration_time': '{:02d}:00-{}:00'.format(start.hour, end_hour),
+        'name': meeting['topic'],
+        'creator': meeting['sponsor'],
+        'detail': meeting['agenda'],
+        'url': meeting['user__avatar'],
+        'join_url': meeting['join_url'],
+        'meeting_id': meeting['mid'],
+        'etherpad': meeting['etherpad'],
+        'replay_url': meeting['replay_url'],
+        'platform': meeting['mplatform']
+    }
+
+
+def build_meeting_buckets(months):
+    """一次查询构建各月份的会议日历，每月为{date: [会议]}"""
+    buckets = {month: {} for month in months}
+    first_day, end_day = get_month_range(months)
+    # mid为空的会议尚未在第三方平台创建成功，不计入日历
+    meetings = Meeting.objects.filter(is_delete=0, date__gte=first_day, date__lt=end_day).exclude(mid='').order_by(
+        'date', 'start').values(
+        'id', 'group_name', 'meeting_type', 'city', 'start', 'end', 'topic', 'sponsor', 'agenda', 'user__avatar',
+        'join_url', 'mid', 'etherpad', 'replay_url', 'mplatform', 'date')
+    for meeting in meetings:
+        date = meeting['date'].strftime('%Y-%m-%d')
+        bucket = buckets.get(date[:7])
+        if bucket is not None:
+            bucket.setdefault(date, []).append(meeting_item(meeting))
+    return buckets
+
+
+def get_meeting_calendar(start_date, end_date):
+    """日期范围内按日期分组的会议日历"""
+    versions = get_month_versions(resource_version.MEETINGS, get_months(start_date, end_date))
+    buckets = get_buckets(MEETING_CALENDAR_KEY, versions, build_meeting_buckets)
+    table_data = []
+    for month in sorted(buckets):
+        for date in sorted(buckets[month]):
+            if start_date <= date <= end_date:
+                table_data.append({'date': date, 'timeData': buckets[month][date]})
+    return table_data
+
+
+def invalidate_meeting_calendar(*dates):
+    """会议创建、取消或更新后递增dates所在月份的日历版本及会议资源版本，其他月份的日历缓存不受影响"""
+    bump_month_versions(resource_version.MEETINGS, dates)
+
+
+def build_activity_buckets(months):
+    """一次查询构建各月份已发布活动的日历，日程在构建时解析后随缓存保存"""
+    buckets = {month: {} for month in months}
+    first_day, end_day = get_month_range(months)
+    activities = Activity.objects.filter(is_delete=0, status__in=[3, 4, 5], start_date__gte=first_day,
+                                         start_date__lt=end_day).order_by('start_date', 'id').values(
+        'id', 'title', 'start_date', 'end_date', 'activity_category', 'activity_type', 'address', 'detail_address',
+        'longitude', 'latitude', 'register_method', 'online_url', 'register_url', 'synopsis', 'sign_url',
+        'replay_url', 'poster', 'wx_code', 'schedules')
+    for activity in activities:
+        activity['start_date'] = activity['start_date'].strftime('%Y-%m-%d')
+        activity['end_date'] = activity['end_date'].strftime('%Y-%m-%d')
+        bucket = buckets.get(activity['start_date'][:7])
+        if bucket is not None:
+            activity['schedules'] = json.loads(activity['schedules']) if activity['schedules'] else None
+            bucket.setdefault(activity['start_date'], []).append(activity)
+    return buckets
+
+
+def get_activity_calendar(start_date, end_date):
+    """日期范围内按开始日期分组的活动日历"""
+    versions = get_month_versions(resource_version.ACTIVITIES, get_months(start_date, end_date))
+    buckets = get_buckets(ACTIVITY_CALENDAR_KEY, versions, build_activity_buckets)
+    table_data = []
+    for month in sorted(buckets):
+        for date in sorted(buckets[month]):
+            if start_date <= date <= end_date:
+                table_data.append({'start_date': date, 'timeData': buckets[month][date]})
+    return table_data
+
+
+def invalidate_activity_calendar(*dates):
+    """活动发布、修改、删除或状态变更后递增dates所在月份的日历版本及活动资源版本，dates为活动变更前后的开始日期"""
+    bump_month_versions(resource_version.ACTIVITIES, dates)
@@ -11,8 +11,9 @@ def createMeeting(platform, date, start, end, topic, host, record):
     return status, content
 
 
-def cancelMeeting(mid):
-    meeting = Meeting.objects.get(mid=mid)
+def cancelMeeting(mid, meeting=None):
+    if not meeting:
+        meeting = Meeting.objects.get(mid=mid)
     mplatform = meeting.mplatform
     host_id = meeting.host_id
     status = None
@@ -32,3 +33,15 @@ def getParticipants(mid):
     elif mplatform == 'welink':
         status, res = welink_apis.getParticipants(mid)
     return status, res
+
+
+def isMeetingEnded(mid, meeting=None):
+    if not meeting:
+        meeting = Meeting.objects.get(mid=mid)
+    mplatform = meeting.mplatform
+    ended = False
+    if mplatform == 'tencent':
+        ended = tecent_apis.isMeetingEnded(mid)
+    elif mplatform == 'welink':
+        ended = welink_apis.isMeetingEnded(mid, meeting.host_id)
+    return ended
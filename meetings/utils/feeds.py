@@ -0,0 +1,124 @@
+import datetime
+import icalendar
+import pytz
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from meetings.utils import calendars, resource_version
+
+FEED_KEY = 'feed:{}:{}:{}'
+
+
+def to_utc(dt):
+    """北京时间转为UTC"""
+    return (dt - datetime.timedelta(hours=8)).replace(tzinfo=pytz.utc)
+
+
+def new_calendar(name):
+    cal = icalendar.Calendar()
+    cal.add('prodid', '-//mindspore conference calendar')
+    cal.add('version', '2.0')
+    cal.add('calscale', 'GREGORIAN')
+    cal.add('method', 'PUBLISH')
+    cal.add('x-wr-calname', name)
+    cal.add('x-wr-timezone', settings.TIME_ZONE)
+    return cal
+
+
+def meeting_event(date, item):
+    """日历缓存中的会议转为VEVENT，uid与邀请邮件一致，日历客户端可合并同一会议"""
+    start = datetime.datetime.strptime('{} {}'.format(date, item['startTime']), '%Y-%m-%d %H:%M')
+    end = datetime.datetime.strptime('{} {}'.format(date, item['endTime']), '%Y-%m-%d %H:%M')
+    if end <= start:
+        end += datetime.timedelta(days=1)
+    event = icalendar.Event()
+    event.add('uid', (item['platform'] or 'tencent') + item['meeting_id'])
+    event.add('summary', item['name'])
+    event.add('dtstart', to_utc(start))
+    event.add('dtend', to_utc(end))
+    event.add('dtstamp', to_utc(start))
+    description = '\n'.join(x for x in [item['detail'], item['join_url'], item['etherpad']] if x)
+    if description:
+        event.add('description', description)
+    if item['join_url']:
+        event.add('url', item['join_url'])
+    return event
+
+
+def activity_event(activity):
+    """日历缓存中的活动转为全天VEVENT"""
+    event = icalendar.Event()
+    event.add('uid', 'activity{}'.format(activity['id']))
+    event.add('summary', activity['title'])
+    event.add('dtstart', datetime.datetime.strptime(activity['start_date'], '%Y-%m-%d').date())
+    event.add('dtend', datetime.datetime.strptime(activity['end_date'], '%Y-%m-%d').date() + datetime.timedelta(days=1))
+    event.add('dtstamp', to_utc(datetime.datetime.strptime(activity['start_date'], '%Y-%m-%d')))
+    description = '\n'.join(x for x in [activity['synopsis'], activity['online_url'], activity['register_url']] if x)
+    if description:
+        event.add('description', description)
+    location = ' '.join(x for x in [activity['address'], activity['detail_address']] if x)
+    if location:
+        event.add('location', location)
+    return event
+
+
+def get_feed(kind, key, names, build):
+    """按资源版本缓存的订阅日历，版本变化后经按月缓存的日历重建
+
+    变更时先递增月份版本再递增资源版本，先读取资源版本再由build(start_date, end_date)读取月份版本，新版本的订阅日历不会由旧的月份日历构建。
+    """
+    start_date, end_date = calendars.get_window({})
+    versions = resource_version.get_versions(names)
+    stamp = '{}:{}'.format(start_date, ','.join(str(versions[name][0]) for name in sorted(names)))
+    cache_key = FEED_KEY.format(kind, key, stamp)
+    content = cache.get(cache_key)
+    if content is None:
+        content = build(start_date, end_date).to_ical()
+        cache.set(cache_key, content, settings.CALENDAR_CACHE_TIMEOUT)
+    return content
+
+
+def build_meeting_feed(name, match):
+    """日历窗口内满足match的已创建会议"""
+
+    def build(start_date, end_date):
+        cal = new_calendar(name)
+        for day in calendars.get_meeting_calendar(start_date, end_date):
+            for item in day['timeData']:
+                if item['meeting_id'] and match(item):
+                    cal.add_component(meeting_event(day['date'], item))
+        return cal
+
+    return build
+
+
+def get_group_feed(group):
+    """组的会议订阅日历"""
+    return get_feed('group', group.id, (resource_version.MEETINGS, resource_version.GROUPS),
+                    build_meeting_feed('MindSpore {}'.format(group.name), lambda x: x['group_name'] == group.name))
+
+
+def get_city_feed(city):
+    """城市MSG的会议订阅日历"""
+    return get_feed('city', city.id, (resource_version.MEETINGS, resource_version.CITIES),
+                    build_meeting_feed('MindSpore MSG {}'.format(city.name),
+                                       lambda x: x['meeting_type'] == 2 and x['city'] == city.name))
+
+
+def build_activity_feed(start_date, end_date):
+    cal = new_calendar('MindSpore Activities')
+    for day in calendars.get_activity_calendar(start_date, end_date):
+        for activity in day['timeData']:
+            cal.add_component(activity_event(activity))
+    return cal
+
+
+def get_activity_feed():
+    """已发布活动的订阅日历"""
+    return get_feed('activities', 'all', (resource_version.ACTIVITIES,), build_activity_feed)
+
+
+def feed_response(content, filename):
+    response = HttpResponse(content, content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="{}"'.format(filename)
+    return response
@@ -0,0 +1,230 @@
+import bisect
+import datetime
+import logging
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from meetings.models import MeetingHost, HostReservation
+
+logger = logging.getLogger('log')
+
+# 同一host上相邻会议之间需预留的缓冲时间
+HOST_BUFFER = datetime.timedelta(minutes=30)
+# 预占记录的有效期，超时未确认(如请求被中断)的预占不再占用host
+RESERVATION_TTL = datetime.timedelta(minutes=5)
+# 按负载选择host时统计会议所在自然周的已预定时长
+OCCUPANCY_WINDOW = datetime.timedelta(days=7)
+
+
+def parse_meeting_time(date, start, end):
+    """将请求中YYYY-MM-DD格式的日期及HH:MM格式的起止时间转为date、time，格式错误时抛出ValueError"""
+    return (datetime.datetime.strptime(date, '%Y-%m-%d').date(), datetime.datetime.strptime(start, '%H:%M').time(),
+            datetime.datetime.strptime(end, '%H:%M').time())
+
+
+def meeting_interval(date, start, end):
+    """获取会议的起止时间，结束时间不晚于开始时间时视为跨越午夜"""
+    start_time = datetime.datetime.combine(date, start)
+    end_time = datetime.datetime.combine(date, end)
+    if end_time <= start_time:
+        end_time += datetime.timedelta(days=1)
+    return start_time, end_time
+
+
+def meeting_duration(start_time, end_time):
+    """会议时长(分钟)"""
+    return int((end_time - start_time).total_seconds() // 60)
+
+
+class HostIntervals:
+    """单个host已预定时段的区间索引
+
+    区间按开始时间排序，并维护结束时间的前缀最大值，判断冲突只需一次二分查找。
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.max_ends = []
+
+    def add(self, start, end):
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        max_end = self.max_ends[i - 1] if i else None
+        del self.max_ends[i:]
+        for item in self.ends[i:]:
+            max_end = item if max_end is None or item > max_end else max_end
+            self.max_ends.append(max_end)
+
+    def overlaps(self, start, end):
+        """[start, end)是否与已预定时段重叠"""
+        i = bisect.bisect_left(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] > start
+
+    def gaps(self, start, end, buffer):
+        """[start, end)内可以安排会议的空闲时段，与已预定时段之间保留缓冲时间"""
+        windows = []
+        free_from = start
+        for busy_start, busy_end in zip(self.starts, self.ends):
+            if busy_start - buffer > free_from:
+                windows.append((free_from, min(busy_start - buffer, end)))
+            free_from = max(free_from, busy_end + buffer)
+            if free_from >= end:
+                break
+        if free_from < end:
+            windows.append((free_from, end))
+        return [window for window in windows if window[0] < window[1]]
+
+
+class HostAvailability:
+    """按host维护的会议占用索引，用于查询空闲host并按负载选择host"""
+
+    def __init__(self, hosts, buffer=HOST_BUFFER):
+        self.hosts = list(hosts)
+        self.buffer = buffer
+        self.index = {host: HostIntervals() for host in self.hosts}
+        self.booked = {host: datetime.timedelta() for host in self.hosts}
+
+    @staticmethod
+    def query(platform, hosts, start, end):
+        """hosts上与[start, end)重叠的已确认会议及未过期的预占"""
+        return HostReservation.objects.filter(
+            Q(expire_time__isnull=True) | Q(expire_time__gt=datetime.datetime.now()),
+            host__platform=platform, host__host_id__in=hosts, start_time__lt=end, end_time__gt=start).values_list(
+            'host__host_id', 'start_time', 'end_time')
+
+    @classmethod
+    def load(cls, platform, hosts, start, end, buffer=HOST_BUFFER, occupancy=False):
+        """从占用表加载[start, end)附近hosts上的占用用于冲突检测
+
+        occupancy为True时另行统计会议所在自然周内各host的已预定时长，用于按负载选择host。
+        """
+        availability = cls(hosts, buffer)
+        for host, busy_start, busy_end in cls.query(platform, availability.hosts, start - buffer, end + buffer):
+            availability.index[host].add(busy_start, busy_end)
+        if occupancy:
+            week_start = datetime.datetime.combine(start.date() - datetime.timedelta(days=start.weekday()),
+                                                   datetime.time())
+            week_end = datetime.datetime.combine(end.date() - datetime.timedelta(days=end.weekday()),
+                                                 datetime.time()) + OCCUPANCY_WINDOW
+            for host, busy_start, busy_end in cls.query(platform, availability.hosts, week_start, week_end):
+                availability.booked[host] += busy_end - busy_start
+        return availability
+
+    def add(self, host, start, end):
+        if host in self.index:
+            self.index[host].add(start, end)
+            self.booked[host] += end - start
+
+    def free_hosts(self, start, end):
+        """[start, end)内(含缓冲时间)空闲的host"""
+        return [host for host in self.hosts
+                if not self.index[host].overlaps(start - self.buffer, end + self.buffer)]
+
+    def candidates(self, start, end):
+        """空闲host按已预定时长从少到多排序"""
+        free_hosts = self.free_hosts(start, end)
+        logger.info('available hosts: {}'.format(free_hosts))
+        return sorted(free_hosts, key=lambda host: self.booked[host])
+
+    def free_windows(self, start, end):
+        """[start, end)内至少有一个host空闲的时段，每个时段内的任意会议都可以分配到同一个host"""
+        windows = set()
+        for host in self.hosts:
+            windows.update(self.index[host].gaps(start, end, self.buffer))
+        result = []
+        max_end = None
+        for window in sorted(windows, key=lambda x: (x[0], x[0] - x[1])):
+            # 去掉被其他host的空闲时段完全覆盖的时段
+            if max_end is not None and window[1] <= max_end:
+                continue
+            result.append(window)
+            max_end = window[1]
+        return result
+
+    def choose(self, start, end):
+        """从空闲host中选择已预定时长最少的host，无可用host时返回None"""
+        candidates = self.candidates(start, end)
+        return candidates[0] if candidates else None
+
+
+def claim_host_slots(platform, host_id, slots):
+    """锁定单个host，在所有时段均空闲时写入预占记录；不同host之间互不阻塞"""
+    host, _ = MeetingHost.objects.get_or_create(platform=platform, host_id=host_id)
+    start = min(slot[0] for slot in slots)
+    end = max(slot[1] for slot in slots)
+    with transaction.atomic():
+        MeetingHost.objects.select_for_update().get(id=host.id)
+        # 持有host锁时顺带删除该host过期未确认的预占，冲突及负载查询不再扫描这些记录
+        now = datetime.datetime.now()
+        HostReservation.objects.filter(host=host, expire_time__lt=now).delete()
+        availability = HostAvailability.load(platform, [host_id], start, end)
+        if any(not availability.free_hosts(*slot) for slot in slots):
+            return []
+        expire_time = now + RESERVATION_TTL
+        return [HostReservation.objects.create(host=host, start_time=slot[0], end_time=slot[1],
+                                               expire_time=expire_time) for slot in slots]
+
+
+def claim_host(platform, host_id, start, end):
+    """锁定单个host，在其空闲时写入预占记录"""
+    reservations = claim_host_slots(platform, host_id, [(start, end)])
+    return reservations[0] if reservations else None
+
+
+def reserve_host(platform, start, end):
+    """按负载依次尝试预占空闲host，返回预占记录，无可用host时返回None"""
+    hosts = settings.MINDSPORE_MEETING_HOSTS[platform]
+    for host_id in HostAvailability.load(platform, hosts, start, end, occupancy=True).candidates(start, end):
+        reservation = claim_host(platform, host_id, start, end)
+        if reservation:
+            return reservation
+        logger.info('host {} was taken by a concurrent booking'.format(host_id))
+    return None
+
+
+def reserve_series(platform, slots):
+    """为系列会议的每个时段分配host并预占，返回(预占记录列表, 冲突时段的开始时间列表)
+
+    所有时段的冲突检测基于一次查询构建的索引完成，再按host分组加锁预占；任一host预占失败时全部释放。
+    """
+    if not slots:
+        return [], []
+    hosts = settings.MINDSPORE_MEETING_HOSTS[platform]
+    availability = HostAvailability.load(platform, hosts, slots[0][0], slots[-1][1], occupancy=True)
+    plan = {}
+    conflicts = []
+    for start, end in slots:
+        host_id = availability.choose(start, end)
+        if not host_id:
+            conflicts.append(start)
+            continue
+        availability.add(host_id, start, end)
+        plan.setdefault(host_id, []).append((start, end))
+    if conflicts:
+        return [], conflicts
+    reservations = []
+    for host_id, host_slots in plan.items():
+        claimed = claim_host_slots(platform, host_id, host_slots)
+        if not claimed:
+            for reservation in reservations:
+                release_host(reservation)
+            return [], [slot[0] for slot in host_slots]
+        reservations.extend(claimed)
+    return sorted(reservations, key=lambda x: x.start_time), []
+
+
+def confirm_host(reservation, meeting):
+    """会议记录写入后，将预占转为该会议对host的长期占用"""
+    HostReservation.objects.filter(id=reservation.id).update(meeting=meeting, expire_time=None)
+
+
+def release_host(reservation):
+    """释放未确认的预占记录，在会议记录写入失败时调用"""
+    HostReservation.objects.filter(id=reservation.id, meeting__isnull=True).delete()
+
+
+def release_meetings(*meeting_ids):
+    """会议取消或创建失败后释放其对host的占用"""
+    HostReservation.objects.filter(meeting_id__in=meeting_ids).delete()
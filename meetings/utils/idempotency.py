@@ -0,0 +1,101 @@
+import datetime
+import functools
+import hashlib
+import json
+import logging
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import JsonResponse, HttpResponse
+from meetings.auth import refresh_access
+from meetings.models import IdempotencyKey
+
+logger = logging.getLogger('log')
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+# 响应中的access随token版本变化，不随响应保存，重放时重新获取
+ACCESS_FIELD = 'access'
+
+
+def get_fingerprint(request):
+    """请求方法、路径、查询参数与请求体的摘要"""
+    body = json.dumps(request.data, sort_keys=True, ensure_ascii=False, default=str)
+    content = '\n'.join([request.method, request.path, request.GET.urlencode(), body])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def dump_response(response):
+    """保存的响应内容，JSON响应中的access置为None"""
+    content = response.content.decode('utf-8')
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content
+    if isinstance(data, dict) and ACCESS_FIELD in data:
+        data[ACCESS_FIELD] = None
+        return json.dumps(data, ensure_ascii=False)
+    return content
+
+
+def replay_response(request, record):
+    """重放首次请求的结果，原响应包含access时填入当前请求可用的access"""
+    content = record.response
+    try:
+        data = json.loads(content)
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and ACCESS_FIELD in data:
+        data[ACCESS_FIELD] = refresh_access(request)
+        content = json.dumps(data, ensure_ascii=False)
+    response = HttpResponse(content, status=record.status_code, content_type='application/json')
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def retake(record, fingerprint):
+    """重新占用已过期或处理超时的幂等键，并发重试时只有一个请求成功"""
+    return IdempotencyKey.objects.filter(id=record.id, create_time=record.create_time).update(
+        fingerprint=fingerprint, status_code=None, response=None, create_time=datetime.datetime.now())
+
+
+def idempotent(func):
+    """携带Idempotency-Key请求头的请求在有效期内只执行一次，重复的请求返回首次请求的结果"""
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        request = self.request
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return func(self, *args, **kwargs)
+        if len(key) > 64:
+            return JsonResponse({'code': 400, 'msg': 'Idempotency-Key不能超过64个字符'})
+        fingerprint = get_fingerprint(request)
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(user_id=request.user.id, key=key, path=request.path,
+                                                       fingerprint=fingerprint)
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user_id=request.user.id, key=key, path=request.path).first()
+            if not record:
+                return JsonResponse({'code': 409, 'msg': '请求处理中，请稍后重试'})
+            now = datetime.datetime.now()
+            # 过期的记录由clearidempotencykeys定期清理，清理前视为不存在
+            expired = record.create_time < now - datetime.timedelta(hours=settings.IDEMPOTENCY_KEY_TTL)
+            if not expired and record.fingerprint != fingerprint:
+                return JsonResponse({'code': 422, 'msg': 'Idempotency-Key已用于其他请求'})
+            if not expired and record.status_code is not None:
+                logger.info('replay request {} {} of user {}'.format(request.path, key, request.user.id))
+                return replay_response(request, record)
+            # 处理中的请求超过租期仍未完成时，视为执行进程已被终止(如uwsgi harakiri)，允许重试
+            leased = record.create_time >= now - datetime.timedelta(seconds=settings.IDEMPOTENCY_KEY_LEASE)
+            if (not expired and leased) or not retake(record, fingerprint):
+                return JsonResponse({'code': 409, 'msg': '请求处理中，请稍后重试'})
+        try:
+            response = func(self, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        IdempotencyKey.objects.filter(id=record.id).update(status_code=response.status_code,
+                                                           response=dump_response(response))
+        return response
+
+    return wrapper
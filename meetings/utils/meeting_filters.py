@@ -0,0 +1,43 @@
+import datetime
+from django.db.models import Count
+
+# 支持精确匹配的查询参数
+EXACT_FILTERS = ('group_name', 'city', 'mplatform', 'sponsor')
+# 计数返回的分组字段
+COUNT_FIELDS = ('group_name', 'city', 'mplatform')
+
+
+def parse_date(value, name):
+    try:
+        return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('{} should be a date in YYYY-MM-DD format'.format(name))
+
+
+def filter_meetings(queryset, params):
+    """按group_name/group_id、city、mplatform、sponsor及from/to日期范围筛选会议，参数无效时抛出ValueError"""
+    conditions = {name: params[name] for name in EXACT_FILTERS if params.get(name)}
+    group_id = params.get('group_id')
+    if group_id:
+        if not group_id.isdigit():
+            raise ValueError('group_id should be an integer')
+        conditions['group_id'] = int(group_id)
+    if params.get('from'):
+        conditions['date__gte'] = parse_date(params['from'], 'from')
+    if params.get('to'):
+        conditions['date__lte'] = parse_date(params['to'], 'to')
+    if 'date__gte' in conditions and 'date__lte' in conditions and conditions['date__gte'] > conditions['date__lte']:
+        raise ValueError('from should not be later than to')
+    return queryset.filter(**conditions)
+
+
+def count_meetings(queryset):
+    """一次分组查询统计筛选结果的总数及按组、城市、平台的数量"""
+    counts = {field: {} for field in COUNT_FIELDS}
+    total = 0
+    for row in queryset.order_by().values(*COUNT_FIELDS).annotate(count=Count('id')):
+        total += row['count']
+        for field in COUNT_FIELDS:
+            if row[field]:
+                counts[field][row[field]] = counts[field].get(row[field], 0) + row['count']
+    return total, counts
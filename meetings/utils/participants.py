@@ -0,0 +1,55 @@
+import datetime
+import json
+from django.conf import settings
+from django.core.cache import cache
+from meetings.models import ParticipantRecord
+from meetings.utils import drivers
+
+PARTICIPANTS_KEY = 'participants:{}'
+
+
+def get_total(res):
+    """第三方平台参会者名单中的人数，腾讯会议为total_count，WeLink为total_records"""
+    for key in ('total_count', 'total_records'):
+        if isinstance(res.get(key), int):
+            return res[key]
+    return len(res.get('participants') or [])
+
+
+def cache_participants(mid, res):
+    """缓存参会人数，查询参会者名单成功后调用"""
+    cache.set(PARTICIPANTS_KEY.format(mid), {
+        'count': get_total(res),
+        'update_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }, settings.PARTICIPANTS_CACHE_TIMEOUT)
+
+
+def get_cached_participants(mid):
+    """缓存的参会人数{count, update_time}，未查询过时返回None"""
+    return cache.get(PARTICIPANTS_KEY.format(mid))
+
+
+def may_be_ended(meeting):
+    """会议是否可能已结束：收到结束事件，或未处于进行中且已过结束时间PARTICIPANTS_FINAL_DELAY分钟
+
+    仅用于减少向第三方平台确认会议状态的次数，是否结束以第三方平台为准。
+    """
+    if meeting.live_status == 2:
+        return True
+    if meeting.live_status == 1:
+        return False
+    end_time = datetime.datetime.combine(meeting.date, meeting.end)
+    return end_time + datetime.timedelta(minutes=settings.PARTICIPANTS_FINAL_DELAY) <= datetime.datetime.now()
+
+
+def save_participants(meeting, res):
+    """第三方平台确认会议已结束后保存参会者名单，之后不再调用第三方平台；名单为空时可能是平台尚未生成记录，不保存"""
+    total = get_total(res)
+    if not total or not may_be_ended(meeting) or not drivers.isMeetingEnded(meeting.mid, meeting):
+        return
+    ParticipantRecord.objects.update_or_create(mid=meeting.mid, defaults={'total': total, 'data': json.dumps(res)})
+
+
+def discard_participants(mid):
+    """会议再次结束时删除已保存的名单，下次查询时重新从第三方平台获取"""
+    ParticipantRecord.objects.filter(mid=mid).delete()
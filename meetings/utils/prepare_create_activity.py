@@ -1,8 +1,18 @@
 import datetime
 
 
+def is_valid_date(date):
+    """日期须为YYYY-MM-DD格式的字符串，活动日期按字符串比较先后"""
+    try:
+        return datetime.datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m-%d') == date
+    except (TypeError, ValueError):
+        return False
+
+
 def prepare(start_date, end_date, activity_category, activity_type, address, detail_address, register_method,
             register_url):
+    if not is_valid_date(start_date) or not is_valid_date(end_date):
+        return {'code': 400, 'msg': 'start_date与end_date的格式应为YYYY-MM-DD'}
     if start_date > end_date:
         return {'code': 400, 'msg': ''}
     if start_date < (datetime.datetime.now() + datetime.timedelta(days=1)).strftime('%Y-%m-%d'):
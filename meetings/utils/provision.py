@@ -0,0 +1,261 @@
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from meetings.models import Meeting, MeetingJob, MeetingSeries, Collect, User
+from meetings.send_email import sendmail, sendmail_series
+from meetings.utils.send_cancel_email import sendmail_bulk
+from meetings.utils import drivers, wx_apis
+from meetings.utils.calendars import invalidate_meeting_calendar
+from meetings.utils.sync import record_deletions, COLLECTIONS
+from meetings.utils.host_allocator import release_meetings
+
+logger = logging.getLogger('log')
+
+JOB_CREATE = 1
+JOB_CANCEL = 2
+
+JOB_PENDING = 0
+JOB_RUNNING = 1
+JOB_SUCCEEDED = 2
+JOB_FAILED = 3
+
+JOB_STATUS_NAMES = {
+    JOB_PENDING: 'pending',
+    JOB_RUNNING: 'running',
+    JOB_SUCCEEDED: 'succeeded',
+    JOB_FAILED: 'failed'
+}
+
+# 处理中的任务超过该时长未更新，视为执行进程已退出，重新处理
+JOB_TIMEOUT = datetime.timedelta(minutes=5)
+# 第n次失败后等待 JOB_RETRY_DELAY * 2^(n-1) 再重试
+JOB_RETRY_DELAY = datetime.timedelta(seconds=10)
+
+
+def create_meeting(meeting, record):
+    """调用第三方平台创建会议并回填会议号与入会链接"""
+    status, resp = drivers.createMeeting(meeting.mplatform, meeting.date.strftime('%Y-%m-%d'),
+                                         meeting.start.strftime('%H:%M'), meeting.end.strftime('%H:%M'), meeting.topic,
+                                         meeting.host_id, record)
+    if status != 200:
+        logger.error('Fail to create meeting {}, status_code is {}'.format(meeting.id, status))
+        return False
+    Meeting.objects.filter(id=meeting.id).update(mid=resp['mid'], mmid=resp['mmid'], join_url=resp['join_url'],
+                                                 update_time=datetime.datetime.now())
+    invalidate_meeting_calendar(meeting.date)
+    logger.info('{} has created a {} meeting which mid is {}.'.format(meeting.sponsor, meeting.mplatform, resp['mid']))
+    logger.info('meeting info: {},{}-{},{}'.format(meeting.date, meeting.start, meeting.end, meeting.topic))
+    # 发送邮件，系列会议在全部创建完成后合并发送
+    if not meeting.series_id:
+        p1 = Process(target=sendmail, args=(resp['mid'], record))
+        p1.start()
+    return True
+
+
+def notify_series(series_id):
+    """系列会议的创建任务全部结束后发送一封合并的邀请"""
+    if MeetingJob.objects.filter(meeting__series_id=series_id, action=JOB_CREATE,
+                                 status__in=[JOB_PENDING, JOB_RUNNING]).exists():
+        return
+    if MeetingSeries.objects.filter(id=series_id, notified=False).update(notified=True):
+        p1 = Process(target=sendmail_series, args=(series_id,))
+        p1.start()
+
+
+def cancel_meeting(meeting):
+    """调用第三方平台取消会议，并通知参会人与收藏者"""
+    mid = meeting.mid
+    status = drivers.cancelMeeting(mid)
+    if status != 200:
+        logger.error('删除会议失败')
+        return False
+    # 发送删除通知邮件
+    from meetings.utils.send_cancel_email import sendmail
+    sendmail(mid)
+
+    Meeting.objects.filter(id=meeting.id).update(is_delete=1, update_time=datetime.datetime.now())
+    release_meetings(meeting.id)
+    invalidate_meeting_calendar(meeting.date)
+    # 发送会议取消通知
+    collections = Collect.objects.filter(meeting_id=meeting.id)
+    if collections:
+        access_token = wx_apis.get_token()
+        topic = meeting.topic
+        time = '{} {}'.format(meeting.date.strftime('%Y-%m-%d'), meeting.start.strftime('%H:%M'))
+        for collection in collections:
+            user = User.objects.get(id=collection.user_id)
+            nickname = user.nickname
+            content = wx_apis.get_remove_template(user.openid, topic, time, mid)
+            r = wx_apis.send_subscription(content, access_token)
+            if r.status_code != 200:
+                logger.error('status code: {}'.format(r.status_code))
+                logger.error('content: {}'.format(r.json()))
+            else:
+                if r.json()['errcode'] != 0:
+                    logger.warning('Error Code: {}'.format(r.json()['errcode']))
+                    logger.warning('Error Msg: {}'.format(r.json()['errmsg']))
+                    logger.warning('receiver: {}'.format(nickname))
+                else:
+                    logger.info('meeting {} cancel message sent to {}.'.format(mid, nickname))
+            # 删除收藏
+            record_deletions(COLLECTIONS, [(collection.id, collection.user_id)])
+            collection.delete()
+    return True
+
+
+def get_cancel_receivers(meeting_ids):
+    """收藏了已取消会议的用户，返回{user: [会议]}"""
+    collections = Collect.objects.filter(meeting_id__in=meeting_ids).select_related('user', 'meeting').order_by(
+        'meeting__date', 'meeting__start')
+    receivers = {}
+    for collection in collections:
+        receivers.setdefault(collection.user, []).append(collection.meeting)
+    return receivers
+
+
+def notify_cancelled(receivers):
+    """批量取消后按收藏者合并发送会议取消通知，整批共用一个微信token"""
+    if receivers:
+        access_token = wx_apis.get_token()
+        for user, meetings in receivers.items():
+            first = meetings[0]
+            topic = first.topic if len(meetings) == 1 else '{}等{}个会议'.format(first.topic[:12], len(meetings))
+            mid = first.mid if len(meetings) == 1 else '{}等'.format(first.mid)
+            time = '{} {}'.format(first.date.strftime('%Y-%m-%d'), first.start.strftime('%H:%M'))
+            content = wx_apis.get_remove_template(user.openid, topic, time, mid)
+            r = wx_apis.send_subscription(content, access_token)
+            if r.status_code != 200:
+                logger.error('status code: {}'.format(r.status_code))
+            elif r.json()['errcode'] != 0:
+                logger.warning('Error Code: {}, receiver: {}'.format(r.json()['errcode'], user.nickname))
+            else:
+                logger.info('cancel message of {} meetings sent to {}.'.format(len(meetings), user.nickname))
+
+
+def notify_bulk_cancel(meeting_ids, receivers):
+    """批量取消后发送邮件及微信通知，在独立进程中执行，通知耗时不计入请求"""
+    sendmail_bulk(meeting_ids)
+    notify_cancelled(receivers)
+
+
+def cancel_meetings(meetings):
+    """批量取消会议：以有限并发调用第三方平台，一次更新软删除，按收件人合并的通知在独立进程中发送
+
+    返回(已取消的会议列表, 取消失败的会议列表)
+    """
+    def cancel(meeting):
+        try:
+            return drivers.cancelMeeting(meeting.mid, meeting) == 200
+        except Exception as e:
+            logger.error('Fail to cancel meeting {}: {}'.format(meeting.mid, e))
+            return False
+        finally:
+            connection.close()
+
+    meetings = list(meetings)
+    with ThreadPoolExecutor(max_workers=settings.MEETING_PROVISION_CONCURRENCY) as executor:
+        results = list(executor.map(cancel, meetings))
+    cancelled = [meeting for meeting, ok in zip(meetings, results) if ok]
+    failed = [meeting for meeting, ok in zip(meetings, results) if not ok]
+    if cancelled:
+        meeting_ids = [meeting.id for meeting in cancelled]
+        Meeting.objects.filter(id__in=meeting_ids).update(is_delete=1, update_time=datetime.datetime.now())
+        release_meetings(*meeting_ids)
+        invalidate_meeting_calendar(*[meeting.date for meeting in cancelled])
+        receivers = get_cancel_receivers(meeting_ids)
+        # 删除收藏
+        collections = Collect.objects.filter(meeting_id__in=meeting_ids)
+        record_deletions(COLLECTIONS, collections.values_list('id', 'user_id'))
+        collections.delete()
+        p1 = Process(target=notify_bulk_cancel, args=(meeting_ids, receivers))
+        p1.start()
+    return cancelled, failed
+
+
+def run_job(job, max_attempts=None):
+    """执行任务，失败后按退避时间等待重试，达到最大尝试次数后标记失败"""
+    max_attempts = max_attempts or settings.MEETING_JOB_MAX_ATTEMPTS
+    meeting = job.meeting
+    error = None
+    try:
+        if job.action == JOB_CREATE:
+            succeeded = create_meeting(meeting, job.record)
+        else:
+            succeeded = cancel_meeting(meeting)
+        if not succeeded:
+            error = 'provider request failed'
+    except Exception as e:
+        logger.error('meeting job {} failed: {}'.format(job.id, e))
+        succeeded = False
+        error = str(e)[:255]
+    now = datetime.datetime.now()
+    attempts = job.attempts + 1
+    next_run_time = None
+    if succeeded:
+        status = JOB_SUCCEEDED
+    elif attempts >= max_attempts:
+        status = JOB_FAILED
+        if job.action == JOB_CREATE:
+            # 创建失败的会议不再占用host
+            Meeting.objects.filter(id=meeting.id).update(is_delete=1, update_time=datetime.datetime.now())
+            release_meetings(meeting.id)
+            invalidate_meeting_calendar(meeting.date)
+    else:
+        status = JOB_PENDING
+        next_run_time = now + JOB_RETRY_DELAY * 2 ** (attempts - 1)
+    MeetingJob.objects.filter(id=job.id).update(status=status, attempts=attempts, error=error,
+                                                next_run_time=next_run_time, update_time=now)
+    job.status, job.attempts, job.error, job.next_run_time = status, attempts, error, next_run_time
+    if job.action == JOB_CREATE and meeting.series_id and status != JOB_PENDING:
+        notify_series(meeting.series_id)
+    return job
+
+
+def submit_job(meeting, action, record=None):
+    """提交任务；未开启异步时在当前请求内执行一次"""
+    job = MeetingJob.objects.filter(meeting=meeting, action=action, status__in=[JOB_PENDING, JOB_RUNNING]).first()
+    if job:
+        return job
+    job = MeetingJob.objects.create(meeting=meeting, action=action, record=record,
+                                    next_run_time=datetime.datetime.now())
+    if not settings.MEETING_PROVISION_ASYNC:
+        run_job(job, max_attempts=1)
+    return job
+
+
+def run_job_in_thread(job):
+    try:
+        return run_job(job, max_attempts=1)
+    finally:
+        connection.close()
+
+
+def submit_jobs(meetings, action, record=None):
+    """批量提交任务；未开启异步时在当前请求内以有限并发执行"""
+    now = datetime.datetime.now()
+    jobs = [MeetingJob.objects.create(meeting=meeting, action=action, record=record, next_run_time=now)
+            for meeting in meetings]
+    if not settings.MEETING_PROVISION_ASYNC:
+        with ThreadPoolExecutor(max_workers=settings.MEETING_PROVISION_CONCURRENCY) as executor:
+            jobs = list(executor.map(run_job_in_thread, jobs))
+    return jobs
+
+
+def acquire_job():
+    """领取一个待执行的任务，多个执行进程之间互不重复
+
+    数据库支持SKIP LOCKED(如MySQL 8)时跳过其他进程锁定的任务，否则(如MySQL 5.7)等待其释放。
+    """
+    now = datetime.datetime.now()
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    with transaction.atomic():
+        job = MeetingJob.objects.select_for_update(skip_locked=skip_locked).filter(
+            Q(status=JOB_PENDING, next_run_time__lte=now) | Q(status=JOB_RUNNING, update_time__lt=now - JOB_TIMEOUT)
+        ).order_by('id').first()
+        if job:
+            MeetingJob.objects.filter(id=job.id).update(status=JOB_RUNNING, update_time=now)
+    return job
@@ -0,0 +1,27 @@
+import itertools
+from dateutil import rrule
+
+# 单个系列会议最多包含的会议数
+MAX_OCCURRENCES = 26
+SUPPORTED_FREQS = ('DAILY', 'WEEKLY', 'MONTHLY')
+
+
+def parse_rule(rule):
+    """解析形如FREQ=WEEKLY;COUNT=12的重复规则，返回规范化的规则字符串"""
+    rule = rule.strip().upper()
+    if rule.startswith('RRULE:'):
+        rule = rule[len('RRULE:'):]
+    params = dict(item.split('=', 1) for item in rule.split(';') if '=' in item)
+    if params.get('FREQ') not in SUPPORTED_FREQS:
+        raise ValueError('FREQ must be one of {}'.format(', '.join(SUPPORTED_FREQS)))
+    if 'COUNT' not in params and 'UNTIL' not in params:
+        raise ValueError('COUNT or UNTIL is required')
+    return rule
+
+
+def expand(rule, dtstart):
+    """展开重复规则，返回各次会议的开始时间"""
+    starts = list(itertools.islice(rrule.rrulestr(parse_rule(rule), dtstart=dtstart), MAX_OCCURRENCES + 1))
+    if len(starts) > MAX_OCCURRENCES:
+        raise ValueError('a series can contain at most {} meetings'.format(MAX_OCCURRENCES))
+    return starts
@@ -0,0 +1,78 @@
+import datetime
+import functools
+import hashlib
+import time
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from meetings.models import ResourceVersion
+
+# 组信息，影响sigs、组列表
+GROUPS = 'groups'
+# 城市信息，影响城市列表
+CITIES = 'cities'
+# 会议及会议收藏，影响会议列表与会议日历
+MEETINGS = 'meetings'
+# 活动及活动收藏，影响活动列表与活动日历
+ACTIVITIES = 'activities'
+# 会议进行状态及入会人次，只影响返回这两个字段的会议列表，不影响会议日历及订阅日历
+LIVE = 'live'
+
+
+def bump(*names):
+    """资源写入后递增其版本号"""
+    now = datetime.datetime.now()
+    for name in names:
+        if ResourceVersion.objects.filter(name=name).update(version=F('version') + 1, update_time=now):
+            continue
+        try:
+            with transaction.atomic():
+                ResourceVersion.objects.create(name=name, version=1)
+        except IntegrityError:
+            ResourceVersion.objects.filter(name=name).update(version=F('version') + 1, update_time=now)
+
+
+def get_versions(names):
+    """资源的版本号及更新时间，返回{name: (version, update_time)}，未写入过的资源版本号为0"""
+    versions = {name: (0, None) for name in names}
+    versions.update(
+        (name, (version, update_time)) for name, version, update_time in
+        ResourceVersion.objects.filter(name__in=names).values_list('name', 'version', 'update_time'))
+    return versions
+
+
+def get_validators(request, names):
+    """根据资源版本、请求路径、当前用户与日期生成ETag及Last-Modified时间戳"""
+    versions = get_versions(names)
+    # 列表按当天日期筛选，日期变化后视为已修改
+    today = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    last_modified = max([today] + [update_time for _, update_time in versions.values() if update_time])
+    user = getattr(request, 'user', None)
+    content = '\n'.join([request.get_full_path(), str(user.pk if user and user.is_authenticated else 0),
+                         today.strftime('%Y-%m-%d')] +
+                        ['{}:{}'.format(name, versions[name][0]) for name in sorted(versions)])
+    etag = '"{}"'.format(hashlib.md5(content.encode('utf-8')).hexdigest())
+    return etag, int(time.mktime(last_modified.timetuple()))
+
+
+def conditional(*names):
+    """GET请求携带的If-None-Match/If-Modified-Since与资源版本一致时直接返回304，不执行查询与序列化"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            etag, last_modified = get_validators(request, names)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = func(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, ('Authorization',))
+            return response
+
+        return wrapper
+
+    return decorator
@@ -16,13 +16,36 @@ from meetings.models import Meeting
 logger = logging.getLogger('log')
 
 
+def get_cancel_calendar(meeting, toaddrs_list, summary):
+    """构造取消会议的日历，summary为日历事件的标题"""
+    platform = meeting.mplatform.replace('tencent', 'Tencent').replace('welink', 'WeLink')
+    dt_start = (datetime.datetime.combine(meeting.date, meeting.start) - datetime.timedelta(hours=8)).replace(tzinfo=pytz.utc)
+    dt_end = (datetime.datetime.combine(meeting.date, meeting.end) - datetime.timedelta(hours=8)).replace(tzinfo=pytz.utc)
+
+    cal = icalendar.Calendar()
+    cal.add('prodid', '-//openeuler conference calendar')
+    cal.add('version', '2.0')
+    cal.add('method', 'CANCEL')
+
+    event = icalendar.Event()
+    event.add('attendee', ','.join(sorted(list(set(toaddrs_list)))))
+    event.add('summary', summary)
+    event.add('dtstart', dt_start)
+    event.add('dtend', dt_end)
+    event.add('dtstamp', dt_start)
+    event.add('uid', platform + str(meeting.mid))
+    event.add('sequence', 1)
+
+    cal.add_component(event)
+    return cal
+
+
 def sendmail(mid):
     mid = str(mid)
     meeting = Meeting.objects.get(mid=mid)
     topic = '[Cancel] ' + meeting.topic
-    date = meeting.date
-    start = meeting.start
-    end = meeting.end
+    date = meeting.date.strftime('%Y-%m-%d')
+    start = meeting.start.strftime('%H:%M')
     join_url = meeting.join_url
     sig_name = meeting.group_name
     toaddrs = meeting.emaillist
@@ -57,24 +80,7 @@ def sendmail(mid):
     msg.attach(content)
 
     # 取消日历
-    dt_start = (datetime.datetime.strptime(date + ' ' + start, '%Y-%m-%d %H:%M') - datetime.timedelta(hours=8)).replace(tzinfo=pytz.utc)
-    dt_end = (datetime.datetime.strptime(date + ' ' + end, '%Y-%m-%d %H:%M') - datetime.timedelta(hours=8)).replace(tzinfo=pytz.utc)
-
-    cal = icalendar.Calendar()
-    cal.add('prodid', '-//openeuler conference calendar')
-    cal.add('version', '2.0')
-    cal.add('method', 'CANCEL')
-
-    event = icalendar.Event()
-    event.add('attendee', ','.join(sorted(list(set(toaddrs_list)))))
-    event.add('summary', topic)
-    event.add('dtstart', dt_start)
-    event.add('dtend', dt_end)
-    event.add('dtstamp', dt_start)
-    event.add('uid', platform + mid)
-    event.add('sequence', 1)
-
-    cal.add_component(event)
+    cal = get_cancel_calendar(meeting, toaddrs_list, topic)
 
     part = MIMEBase('text', 'calendar', method='CANCEL')
     part.set_payload(cal.to_ical())
@@ -105,3 +111,51 @@ def sendmail(mid):
     except smtplib.SMTPException as e:
         logger.error(e)
 
+
+def sendmail_bulk(meeting_ids):
+    """批量取消会议后按收件人合并发送取消通知，每个收件人一封邮件，所有邮件复用同一SMTP连接"""
+    meetings = Meeting.objects.filter(id__in=meeting_ids).order_by('date', 'start')
+    recipients = {}
+    for meeting in meetings:
+        toaddrs = (meeting.emaillist or '').replace(' ', '').replace('，', ',').replace(';', ',').replace('；', ',')
+        for addr in set(toaddrs.split(',')):
+            if re.match(r'^[a-zA-Z0-9+_.-]+@[a-zA-Z0-9_-]+(\.[a-zA-Z0-9_-]+)+$', addr):
+                recipients.setdefault(addr, []).append(meeting)
+    if not recipients:
+        return
+    with open('templates/template_cancel_meeting.txt', 'r', encoding='utf-8') as fp:
+        template = fp.read()
+    sender = settings.DEFAULT_CONF.get('SMTP_SENDER', '')
+    try:
+        server = smtplib.SMTP(settings.SMTP_SERVER_HOST, settings.SMTP_SERVER_PORT)
+        server.ehlo()
+        server.starttls()
+        server.login(settings.GMAIL_USERNAME, settings.GMAIL_PASSWORD)
+        for addr, addr_meetings in recipients.items():
+            msg = MIMEMultipart()
+            body_of_email = '\n'.join(
+                template.strip().replace('{{platform}}', x.mplatform.replace('tencent', 'Tencent').replace(
+                    'welink', 'WeLink')).replace('{{start_time}}', ' '.join([x.date.strftime('%Y-%m-%d'), x.start.strftime('%H:%M')])).replace(
+                    '{{sig_name}}', '专家委员会' if x.group_name == 'Tech' else x.group_name)
+                for x in addr_meetings)
+            msg.attach(MIMEText(body_of_email, 'plain', 'utf-8'))
+            # 每个会议附带一个取消日历
+            for x in addr_meetings:
+                filename = 'cancel-{}.ics'.format(x.mid)
+                part = MIMEBase('text', 'calendar', method='CANCEL', name=filename)
+                part.set_payload(get_cancel_calendar(x, [addr], '[Cancel] ' + x.topic).to_ical())
+                encoders.encode_base64(part)
+                part.add_header('Content-class', 'urn:content-classes:calendarmessage')
+                part.add_header('Content-Disposition', 'attachment', filename=filename)
+                msg.attach(part)
+            if len(addr_meetings) == 1:
+                msg['Subject'] = '[Cancel] ' + addr_meetings[0].topic
+            else:
+                msg['Subject'] = '[Cancel] {} meetings have been cancelled'.format(len(addr_meetings))
+            msg['From'] = 'MindSpore conference <%s>' % sender
+            msg['To'] = addr
+            server.sendmail(sender, [addr], msg.as_string())
+        logger.info('bulk cancel email sent to {} recipients'.format(len(recipients)))
+        server.quit()
+    except smtplib.SMTPException as e:
+        logger.error(e)
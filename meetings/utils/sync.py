@@ -0,0 +1,101 @@
+import base64
+import datetime
+import json
+from django.conf import settings
+from django.db.models import Q
+from meetings.models import Meeting, Activity, Collect, ActivityCollect, Tombstone
+
+COLLECTIONS = 'collections'
+ACTIVITY_COLLECTIONS = 'activitycollections'
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+class CursorExpired(Exception):
+    """同步游标早于删除记录的保留期限"""
+
+
+def record_deletions(resource, rows):
+    """物理删除收藏前登记删除记录，rows为(id, user_id)列表，同时清理过期的删除记录"""
+    expire_time = datetime.datetime.now() - datetime.timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    Tombstone.objects.filter(delete_time__lt=expire_time).delete()
+    Tombstone.objects.bulk_create([Tombstone(resource=resource, object_id=object_id, user_id=user_id)
+                                   for object_id, user_id in rows])
+
+
+def parse_cursor(cursor):
+    """解析游标为{stream: (time, id)}，无效时抛出ValueError"""
+    if not cursor:
+        return {}
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        return {stream: (datetime.datetime.strptime(time, TIME_FORMAT), int(pk)) for stream, (time, pk) in
+                data.items()}
+    except (TypeError, AttributeError, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError('invalid cursor') from e
+
+
+def dump_cursor(positions):
+    data = {stream: [time.strftime(TIME_FORMAT), pk] for stream, (time, pk) in positions.items()}
+    return base64.urlsafe_b64encode(json.dumps(data, sort_keys=True).encode('utf-8')).decode('ascii')
+
+
+def get_changes(queryset, field, position, limit):
+    """按(field, id)键集取position之后的至多limit条记录，返回(记录, 是否还有更多)"""
+    if position:
+        time, pk = position
+        queryset = queryset.filter(Q(**{field + '__gt': time}) | Q(**{field: time, 'id__gt': pk}))
+    rows = list(queryset.order_by(field, 'id')[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def get_streams(user):
+    """参与同步的数据流：(名称, 查询集, 时间字段, 首次同步时的查询集)，匿名用户不同步收藏
+
+    mid为空的会议尚未在第三方平台创建成功，创建成功回填mid时更新update_time，届时再同步。
+    """
+    streams = [
+        ('meetings', Meeting.objects.exclude(mid=''), 'update_time',
+         Meeting.objects.filter(is_delete=0).exclude(mid='')),
+        ('activities', Activity.objects.all(), 'update_time', Activity.objects.filter(is_delete=0, status__gt=2)),
+    ]
+    if user and user.is_authenticated:
+        streams += [
+            (COLLECTIONS, Collect.objects.filter(user_id=user.pk), 'update_time', None),
+            (COLLECTIONS + '_deleted', Tombstone.objects.filter(user_id=user.pk, resource=COLLECTIONS),
+             'delete_time', Tombstone.objects.none()),
+            (ACTIVITY_COLLECTIONS, ActivityCollect.objects.filter(user_id=user.pk), 'update_time', None),
+            (ACTIVITY_COLLECTIONS + '_deleted',
+             Tombstone.objects.filter(user_id=user.pk, resource=ACTIVITY_COLLECTIONS), 'delete_time',
+             Tombstone.objects.none()),
+        ]
+    return streams
+
+
+def get_sync(user, cursor, limit):
+    """游标之后新增、修改与删除的会议、活动及当前用户的收藏
+
+    返回({stream: [记录]}, 新游标, 是否还有更多)。游标为空时返回当前全部有效数据；
+    未取完的数据流游标停在最后一条记录，取完的数据流游标推进到当前时间减SYNC_CURSOR_LAG，
+    期间提交的写入会在下次同步时重复返回，客户端按id覆盖即可。
+    """
+    positions = parse_cursor(cursor)
+    now = datetime.datetime.now()
+    expire_time = now - datetime.timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    if any(positions.get(stream) and positions[stream][0] < expire_time for stream in
+           (COLLECTIONS + '_deleted', ACTIVITY_COLLECTIONS + '_deleted')):
+        raise CursorExpired()
+    lag = (now - datetime.timedelta(seconds=settings.SYNC_CURSOR_LAG), 0)
+    changes = {}
+    has_more = False
+    for stream, queryset, field, initial in get_streams(user):
+        position = positions.get(stream)
+        if position is None and initial is not None:
+            queryset = initial
+        rows, more = get_changes(queryset, field, position, limit)
+        changes[stream] = rows
+        if more:
+            has_more = True
+            positions[stream] = (getattr(rows[-1], field), rows[-1].id)
+        else:
+            positions[stream] = max(position, lag) if position else lag
+    return changes, dump_cursor(positions), has_more
@@ -125,3 +125,17 @@ def getParticipants(mid):
     signature, headers = get_signature('GET', uri, "")
     r = requests.get(url, headers=headers)
     return r.status_code, r.json()
+
+
+def isMeetingEnded(mid):
+    """查询会议状态，腾讯会议返回MEETING_STATE_ENDED时会议已结束"""
+    meeting = Meeting.objects.get(mid=mid)
+    uri = '/v1/meetings/{}?userid={}'.format(meeting.mmid, meeting.host_id)
+    url = get_url(uri)
+    signature, headers = get_signature('GET', uri, "")
+    r = requests.get(url, headers=headers)
+    if r.status_code != 200:
+        logger.error('Fail to get status of meeting {}, status_code is {}'.format(mid, r.status_code))
+        return False
+    meeting_info_list = r.json().get('meeting_info_list') or [{}]
+    return meeting_info_list[0].get('status') == 'MEETING_STATE_ENDED'
@@ -0,0 +1,90 @@
+import datetime
+import hashlib
+import hmac
+import json
+import logging
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from meetings.models import Meeting, MeetingEvent
+from meetings.utils import participants, resource_version
+
+logger = logging.getLogger('log')
+
+MEETING_STARTED = 'meeting.started'
+MEETING_ENDED = 'meeting.end'
+PARTICIPANT_JOINED = 'meeting.participant-joined'
+# 会议开始、结束事件对应的状态，状态只前进不回退，乱序到达的事件不会覆盖较新的状态
+LIVE_STATUS = {
+    MEETING_STARTED: 1,
+    MEETING_ENDED: 2,
+}
+EVENTS = (MEETING_STARTED, MEETING_ENDED, PARTICIPANT_JOINED)
+
+
+def check_signature(meta, data):
+    """校验腾讯会议回调的签名：token、X-TC-Timestamp、X-TC-Nonce及data(或check_str)按字典序拼接后的SHA1
+
+    未配置TX_MEETING_WEBHOOK_TOKEN时不校验，此时也不处理会改变会议状态的事件。
+    """
+    token = settings.TX_MEETING_WEBHOOK_TOKEN
+    if not token:
+        return True
+    timestamp = meta.get('HTTP_X_TC_TIMESTAMP', '')
+    nonce = meta.get('HTTP_X_TC_NONCE', '')
+    signature = meta.get('HTTP_X_TC_SIGNATURE', '')
+    expected = hashlib.sha1(''.join(sorted([token, timestamp, nonce, data or ''])).encode('utf-8')).hexdigest()
+    return hmac.compare_digest(expected.encode('utf-8'), signature.encode('utf-8'))
+
+
+def get_event_id(data):
+    """回调事件id，腾讯会议为trace_id，缺失时取事件内容的摘要"""
+    if data.get('trace_id'):
+        return str(data['trace_id'])[:64]
+    return hashlib.md5(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def apply_event(event, mid):
+    """将事件写入会议的状态及入会人次，返回更新的会议数"""
+    meetings = Meeting.objects.filter(mid=mid, is_delete=0)
+    now = datetime.datetime.now()
+    if event == PARTICIPANT_JOINED:
+        return meetings.update(attendee_count=F('attendee_count') + 1, update_time=now)
+    status = LIVE_STATUS[event]
+    return meetings.filter(live_status__lt=status).update(live_status=status, update_time=now)
+
+
+def ingest(data):
+    """处理会议开始、结束及成员入会事件，返回False表示非此类事件，由调用方继续处理
+
+    事件按id去重，第三方平台重试或重复推送的事件只生效一次。
+    """
+    event = data.get('event')
+    if event not in EVENTS:
+        return False
+    if not settings.TX_MEETING_WEBHOOK_TOKEN:
+        logger.warning('ignore meeting event {}: TX_MEETING_WEBHOOK_TOKEN is not configured'.format(event))
+        return True
+    try:
+        mid = data['payload'][0]['meeting_info']['meeting_code']
+    except (KeyError, IndexError, TypeError):
+        logger.warning('meeting event without meeting_code: {}'.format(data))
+        return True
+    event_id = get_event_id(data)
+    try:
+        with transaction.atomic():
+            MeetingEvent.objects.create(event_id=event_id, event=event, mid=mid)
+            updated = apply_event(event, mid)
+            # 会议可能在结束后再次开启，已保存的名单可能不完整，删除后下次查询时重新获取
+            if event == MEETING_ENDED:
+                participants.discard_participants(mid)
+    except IntegrityError:
+        logger.info('duplicate meeting event {}'.format(event_id))
+        return True
+    # 会议状态与入会人次频繁变化，只递增LIVE版本，避免会议进行期间日历及订阅日历的缓存反复失效
+    if updated:
+        resource_version.bump(resource_version.LIVE)
+    logger.info('meeting event {} for {}, {} meeting(s) updated'.format(event, mid, updated))
+    expire_time = datetime.datetime.now() - datetime.timedelta(days=settings.MEETING_EVENT_DAYS)
+    MeetingEvent.objects.filter(create_time__lt=expire_time).delete()
+    return True
@@ -153,6 +153,12 @@ def getParticipants(mid):
     return status, participants
 
 
+def isMeetingEnded(mid, host_id):
+    """会议出现在历史会议列表中时已结束"""
+    meetings_data = listHisMeetings(host_id).get('data') or []
+    return any(item['conferenceID'] == str(mid) for item in meetings_data)
+
+
 def listRecordings(host_id):
     """获取录像列表"""
     access_token = createProxyToken(host_id)
@@ -31,8 +31,8 @@ def get_openid(code):
     """获取小程序用户openid"""
     url = settings.DEFAULT_CONF.get('WX_JSCODE2SESSION_URL')
     params = {
-        'appid': settings.APP_CONF['appid'],
-        'secret': settings.APP_CONF['secret'],
+        'appid': settings.MINDSPORE_APP_CONF['appid'],
+        'secret': settings.MINDSPORE_APP_CONF['secret'],
         'js_code': code,
         'grant_type': 'authorization_code'
     }
@@ -1,6 +1,5 @@
 import datetime
 import json
-import math
 import os
 import re
 import sys
@@ -8,8 +7,7 @@ import tempfile
 import traceback
 import wget
 from django.conf import settings
-from multiprocessing import Process
-from django.db.models import Q
+from django.db.models import Q, F, OuterRef, Subquery
 from django.http import JsonResponse, HttpResponse
 from rest_framework import permissions
 from rest_framework import status
@@ -19,8 +17,9 @@ from rest_framework.mixins import CreateModelMixin, UpdateModelMixin, ListModelM
     DestroyModelMixin
 from rest_framework.response import Response
 from rest_framework_simplejwt import authentication
-from rest_framework_simplejwt.tokens import RefreshToken
-from meetings.models import Meeting, Record, Activity, ActivityCollect
+from meetings.models import Meeting, Record, Activity, ActivityCollect, MeetingJob, MeetingSeries, ParticipantRecord
+from meetings.pagination import MeetingCursorPagination, ActivityCursorPagination
+from meetings.sparse import SparseFieldsMixin
 from meetings.permissions import MaintainerPermission, AdminPermission, QueryPermission, SponsorPermission, \
     ActivityAdminPermission
 from meetings.models import GroupUser, Group, User, Collect, Feedback, City, CityUser
@@ -30,23 +29,23 @@ from meetings.serializers import LoginSerializer, UsersInGroupSerializer, SigsSe
     CitiesSerializer, CityUserAddSerializer, CityUserDelSerializer, UserCitySerializer, SponsorSerializer, \
     ActivitySerializer, ActivityUpdateSerializer, ActivityDraftUpdateSerializer, ActivitiesSerializer, \
     ActivityRetrieveSerializer, ActivityCollectSerializer
-from meetings.send_email import sendmail
 from meetings.utils.tecent_apis import *
-from meetings.utils import send_feedback, prepare_create_activity, gene_wx_code, wx_apis
+from meetings.utils import send_feedback, prepare_create_activity, gene_wx_code
 from obs import ObsClient
 from meetings.utils import drivers
-from meetings.auth import CustomAuthentication
+from meetings.utils import recurrence, calendars, feeds, sync, meeting_filters, participants, webhook_events
+from meetings.utils.idempotency import idempotent
+from meetings.utils import resource_version
+from meetings.utils.resource_version import conditional
+from meetings.utils.host_allocator import parse_meeting_time, meeting_interval, meeting_duration, reserve_host, \
+    reserve_series, confirm_host, release_host, HostAvailability
+from meetings.utils.provision import submit_job, submit_jobs, cancel_meetings, JOB_CREATE, JOB_CANCEL, \
+    JOB_SUCCEEDED, JOB_FAILED, JOB_STATUS_NAMES
+from meetings.auth import CustomAuthentication, invalidate_principals, revoke_permission_claims, refresh_access
 
 logger = logging.getLogger('log')
 
 
-def refresh_access(user):
-    refresh = RefreshToken.for_user(user)
-    access = str(refresh.access_token)
-    User.objects.filter(id=user.id).update(signature=access)
-    return access
-
-
 class LoginView(GenericAPIView, CreateModelMixin, ListModelMixin):
     """用户注册与授权登陆"""
     serializer_class = LoginSerializer
@@ -156,6 +155,7 @@ class SigsView(GenericAPIView, ListModelMixin):
     serializer_class = SigsSerializer
     queryset = Group.objects.filter(group_type=1)
 
+    @conditional(resource_version.GROUPS)
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
@@ -165,6 +165,7 @@ class GroupsView(GenericAPIView, ListModelMixin):
     serializer_class = GroupsSerializer
     queryset = Group.objects.all()
 
+    @conditional(resource_version.GROUPS)
     def get(self, request, *args, **kwargs):
         self.queryset = self.queryset.filter(group_type__in=(2, 3))
         return self.list(request, *args, **kwargs)
@@ -175,6 +176,7 @@ class CitiesView(GenericAPIView, ListModelMixin):
     serializer_class = CitiesSerializer
     queryset = City.objects.all()
 
+    @conditional(resource_version.CITIES)
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
 
@@ -187,13 +189,14 @@ class AddCityView(GenericAPIView, CreateModelMixin):
     permission_classes = (AdminPermission,)
 
     def post(self, request, *args, **kwargs):
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         data = self.request.data
         name = data.get('name')
         if name in City.objects.all().values_list('name', flat=True):
             return JsonResponse({'code': 400, 'msg': '城市名重复', 'access': access})
         etherpad = 'https://etherpad.mindspore.cn/p/meetings-MSG/{}'.format(name)
         City.objects.create(name=name, etherpad=etherpad)
+        resource_version.bump(resource_version.CITIES)
         return JsonResponse({'code': 201, 'msg': '添加成功', 'access': access})
 
 
@@ -212,7 +215,7 @@ class GroupUserAddView(GenericAPIView, CreateModelMixin):
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         data = serializer.data
         data['access'] = access
         response = Response()
@@ -234,7 +237,7 @@ class GroupUserDelView(GenericAPIView, CreateModelMixin):
         ids = self.request.data.get('ids')
         ids_list = [int(x) for x in ids.split('-')]
         GroupUser.objects.filter(group_id=group_id, user_id__in=ids_list).delete()
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         return JsonResponse({'code': 204, 'msg': '删除成功', 'access': access})
 
 
@@ -253,7 +256,7 @@ class CityUserAddView(GenericAPIView, CreateModelMixin):
         serializer.is_valid(raise_exception=True)
         self.perform_create(serializer)
         headers = self.get_success_headers(serializer.data)
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         data = serializer.data
         data['access'] = access
         response = Response()
@@ -278,7 +281,7 @@ class CityUserDelView(GenericAPIView, CreateModelMixin):
         for user_id in ids_list:
             if not CityUser.objects.filter(user_id=user_id):
                 GroupUser.objects.filter(group_id=1, user_id=int(user_id)).delete()
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         return JsonResponse({'code': 204, 'msg': '删除成功', 'access': access})
 
 
@@ -342,13 +345,18 @@ class UpdateUserInfoView(GenericAPIView, UpdateModelMixin):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
+        levels = (instance.level, instance.activity_level)
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        if (instance.level, instance.activity_level) != levels:
+            revoke_permission_claims(instance.id)
+        else:
+            invalidate_principals(instance.id)
 
         if getattr(instance, '_prefetched_objects_cache', None):
             instance._prefetched_objects_cache = {}
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         data = serializer.data
         data['access'] = access
         response = Response()
@@ -363,11 +371,11 @@ class CreateMeetingView(GenericAPIView, CreateModelMixin):
     authentication_classes = (CustomAuthentication,)
     permission_classes = (MaintainerPermission,)
 
+    @idempotent
     def post(self, *args, **kwargs):
         data = self.request.data
         platform = data['platform'] if 'platform' in data else 'tencent'
         platform = platform.lower()
-        host_list = settings.MINDSPORE_MEETING_HOSTS[platform]
         topic = data['topic']
         sponsor = data['sponsor']
         meeting_type = data['meeting_type']
@@ -382,58 +390,35 @@ class CreateMeetingView(GenericAPIView, CreateModelMixin):
         agenda = data['agenda'] if 'agenda' in data else None
         record = data['record'] if 'record' in data else None
         user_id = self.request.user.id
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         if meeting_type == 2 and not city:
             return JsonResponse({'code': 400, 'msg': 'MSG会议的城市不能为空', 'access': access})
         if not Group.objects.filter(name=group_name):
             return JsonResponse({'code': 400, 'msg': '错误的group_name', 'access': access})
         group_id = Group.objects.get(name=group_name).id
+        try:
+            date, start, end = parse_meeting_time(date, start, end)
+        except (TypeError, ValueError):
+            return JsonResponse({'code': 400, 'msg': '请输入正确的会议日期与时间', 'access': access})
         # 根据时间判断当前可用host，并选择host
-        start_time = date + ' ' + start
-        end_time = date + ' ' + end
-        if start_time < datetime.datetime.now().strftime('%Y-%m-%d %H:%M'):
+        start_dt, end_dt = meeting_interval(date, start, end)
+        if start_dt < datetime.datetime.now().replace(second=0, microsecond=0):
             logger.warning('The start time should not be earlier than the current time.')
             return JsonResponse({'code': 1005, 'message': '请输入正确的开始时间', 'access': access})
         if start >= end:
             logger.warning('The end time must be greater than the start time.')
             return JsonResponse({'code': 1001, 'message': '请输入正确的结束时间', 'access': access})
-        start_search = datetime.datetime.strftime(
-            (datetime.datetime.strptime(start, '%H:%M') - datetime.timedelta(minutes=30)),
-            '%H:%M')
-        end_search = datetime.datetime.strftime(
-            (datetime.datetime.strptime(end, '%H:%M') + datetime.timedelta(minutes=30)),
-            '%H:%M')
-        # 查询待创建的会议与现有的预定会议是否冲突
-        unavailable_host_id = []
-        available_host_id = []
-        meetings = Meeting.objects.filter(is_delete=0, date=date, end__gt=start_search, start__lt=end_search).values()
-        try:
-            for meeting in meetings:
-                host_id = meeting['host_id']
-                unavailable_host_id.append(host_id)
-            logger.info('unavilable_host_id:{}'.format(unavailable_host_id))
-        except KeyError:
-            pass
-        logger.info('host_list: {}'.format(host_list))
-        for host_id in host_list:
-            if host_id not in unavailable_host_id:
-                available_host_id.append(host_id)
-        logger.info('avilable_host_id: {}'.format(available_host_id))
-        if len(available_host_id) == 0:
+        # 查询待创建的会议与现有的预定会议是否冲突，按负载预占空闲host后再调用第三方平台创建会议
+        reservation = reserve_host(platform, start_dt, end_dt)
+        if not reservation:
             logger.warning('暂无可用host')
             return JsonResponse({'code': 1000, 'message': '时间冲突，请调整时间预定会议！', 'access': access})
-        # 从available_host_id中随机生成一个host_id,并在host_dict中取出
-        host_id = random.choice(available_host_id)
+        host_id = reservation.host.host_id
         logger.info('host_id: {}'.format(host_id))
-        status, resp = drivers.createMeeting(platform, date, start, end, topic, host_id, record)
-        if status == 200:
-            meeting_id = resp['mmid']
-            meeting_code = resp['mid']
-            join_url = resp['join_url']
-            # 保存数据
-            Meeting.objects.create(
-                mid=meeting_code,
-                mmid=meeting_id,
+        try:
+            # 写入待创建的会议，由会议本身占用host
+            meeting = Meeting.objects.create(
+                mid='',
                 topic=topic,
                 community=community,
                 meeting_type=meeting_type,
@@ -443,7 +428,7 @@ class CreateMeetingView(GenericAPIView, CreateModelMixin):
                 date=date,
                 start=start,
                 end=end,
-                join_url=join_url,
+                duration=meeting_duration(start_dt, end_dt),
                 etherpad=etherpad,
                 emaillist=emaillist,
                 group_name=group_name,
@@ -453,15 +438,158 @@ class CreateMeetingView(GenericAPIView, CreateModelMixin):
                 city=city,
                 mplatform=platform
             )
-            logger.info('{} has created a {} meeting which mid is {}.'.format(sponsor, platform, meeting_code))
-            logger.info('meeting info: {},{}-{},{}'.format(date, start, end, topic))
-            # 发送邮件
-            p1 = Process(target=sendmail, args=(meeting_code, record))
-            p1.start()
-            meeting_id = Meeting.objects.get(mid=meeting_code).id
-            return JsonResponse({'code': 201, 'msg': '创建成功', 'id': meeting_id, 'access': access})
-        else:
+            confirm_host(reservation, meeting)
+        finally:
+            release_host(reservation)
+        calendars.invalidate_meeting_calendar(date)
+        job = submit_job(meeting, JOB_CREATE, record)
+        if job.status == JOB_SUCCEEDED:
+            return JsonResponse({'code': 201, 'msg': '创建成功', 'id': meeting.id, 'access': access})
+        if job.status == JOB_FAILED:
             return JsonResponse({'code': 400, 'msg': '创建失败', 'access': access})
+        return JsonResponse({'code': 202, 'msg': '会议创建中', 'id': meeting.id, 'job_id': job.id, 'access': access})
+
+
+class MeetingSeriesView(GenericAPIView, CreateModelMixin):
+    """按重复规则预定系列会议"""
+    serializer_class = MeetingSerializer
+    queryset = Meeting.objects.all()
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (MaintainerPermission,)
+
+    @idempotent
+    def post(self, *args, **kwargs):
+        data = self.request.data
+        platform = data['platform'] if 'platform' in data else 'tencent'
+        platform = platform.lower()
+        topic = data['topic']
+        sponsor = data['sponsor']
+        meeting_type = data['meeting_type']
+        date = data['date']
+        start = data['start']
+        end = data['end']
+        rule = data['rrule']
+        etherpad = data['etherpad']
+        group_name = data['group_name']
+        community = 'mindspore'
+        city = data['city'] if 'city' in data else None
+        emaillist = data['emaillist'] if 'emaillist' in data else None
+        agenda = data['agenda'] if 'agenda' in data else None
+        record = data['record'] if 'record' in data else None
+        user_id = self.request.user.id
+        access = refresh_access(self.request)
+        if meeting_type == 2 and not city:
+            return JsonResponse({'code': 400, 'msg': 'MSG会议的城市不能为空', 'access': access})
+        group = Group.objects.filter(name=group_name).first()
+        if not group:
+            return JsonResponse({'code': 400, 'msg': '错误的group_name', 'access': access})
+        try:
+            date, start, end = parse_meeting_time(date, start, end)
+        except (TypeError, ValueError):
+            return JsonResponse({'code': 400, 'msg': '请输入正确的会议日期与时间', 'access': access})
+        start_dt, end_dt = meeting_interval(date, start, end)
+        if start_dt < datetime.datetime.now().replace(second=0, microsecond=0):
+            logger.warning('The start time should not be earlier than the current time.')
+            return JsonResponse({'code': 1005, 'message': '请输入正确的开始时间', 'access': access})
+        if start >= end:
+            logger.warning('The end time must be greater than the start time.')
+            return JsonResponse({'code': 1001, 'message': '请输入正确的结束时间', 'access': access})
+        try:
+            starts = recurrence.expand(rule, start_dt)
+        except ValueError as e:
+            logger.warning('invalid rrule {}: {}'.format(rule, e))
+            return JsonResponse({'code': 400, 'msg': '错误的重复规则', 'access': access})
+        if not starts:
+            logger.warning('rrule {} has no occurrence after {}'.format(rule, start_dt))
+            return JsonResponse({'code': 400, 'msg': '重复规则没有可预定的会议', 'access': access})
+        # 一次查询检测所有时段的冲突，全部可用时才预占host
+        slots = [(x, x + (end_dt - start_dt)) for x in starts]
+        reservations, conflicts = reserve_series(platform, slots)
+        if conflicts:
+            logger.warning('series conflicts: {}'.format(conflicts))
+            return JsonResponse({'code': 1000, 'message': '时间冲突，请调整时间预定会议！',
+                                 'conflicts': [x.strftime('%Y-%m-%d') for x in conflicts], 'access': access})
+        try:
+            series = MeetingSeries.objects.create(topic=topic, rrule=recurrence.parse_rule(rule), user_id=user_id,
+                                                  group_id=group.id)
+            meetings = []
+            for reservation in reservations:
+                meeting = Meeting.objects.create(
+                    mid='',
+                    topic=topic,
+                    community=community,
+                    meeting_type=meeting_type,
+                    group_type=meeting_type,
+                    sponsor=sponsor,
+                    agenda=agenda,
+                    date=reservation.start_time.date(),
+                    start=start,
+                    end=end,
+                    duration=meeting_duration(start_dt, end_dt),
+                    etherpad=etherpad,
+                    emaillist=emaillist,
+                    group_name=group_name,
+                    host_id=reservation.host.host_id,
+                    user_id=user_id,
+                    group_id=group.id,
+                    city=city,
+                    mplatform=platform,
+                    series=series
+                )
+                confirm_host(reservation, meeting)
+                meetings.append(meeting)
+        finally:
+            for reservation in reservations:
+                release_host(reservation)
+        calendars.invalidate_meeting_calendar(*[meeting.date for meeting in meetings])
+        jobs = submit_jobs(meetings, JOB_CREATE, record)
+        failed = [meeting.date.strftime('%Y-%m-%d') for meeting, job in zip(meetings, jobs)
+                  if job.status == JOB_FAILED]
+        logger.info('{} has booked series {} with {} meetings'.format(sponsor, series.id, len(meetings)))
+        result = {
+            'series_id': series.id,
+            'ids': [meeting.id for meeting, job in zip(meetings, jobs) if job.status != JOB_FAILED],
+            'failed': failed,
+            'access': access
+        }
+        if any(job.status not in (JOB_SUCCEEDED, JOB_FAILED) for job in jobs):
+            result.update({'code': 202, 'msg': '会议创建中', 'job_ids': [job.id for job in jobs]})
+        elif not failed:
+            result.update({'code': 201, 'msg': '创建成功'})
+        elif len(failed) == len(jobs):
+            result.update({'code': 400, 'msg': '创建失败'})
+        else:
+            result.update({'code': 201, 'msg': '部分会议创建失败'})
+        return JsonResponse(result)
+
+
+class AvailabilityView(GenericAPIView):
+    """查询会议平台在日期范围内的空闲时段"""
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (MaintainerPermission,)
+
+    def get(self, request, *args, **kwargs):
+        platform = self.request.GET.get('platform', 'tencent').lower()
+        start_date = self.request.GET.get('start_date')
+        end_date = self.request.GET.get('end_date', start_date)
+        if platform not in settings.MINDSPORE_MEETING_HOSTS:
+            return JsonResponse({'code': 400, 'msg': '错误的会议平台'})
+        try:
+            start = datetime.datetime.strptime(start_date, '%Y-%m-%d')
+            end = datetime.datetime.strptime(end_date, '%Y-%m-%d') + datetime.timedelta(days=1)
+        except (TypeError, ValueError):
+            return JsonResponse({'code': 400, 'msg': '请输入正确的日期'})
+        if not start < end <= start + datetime.timedelta(days=settings.AVAILABILITY_MAX_DAYS):
+            return JsonResponse({'code': 400, 'msg': '日期范围不能超过{}天'.format(settings.AVAILABILITY_MAX_DAYS)})
+        start = max(start, datetime.datetime.now().replace(second=0, microsecond=0))
+        hosts = settings.MINDSPORE_MEETING_HOSTS[platform]
+        windows = HostAvailability.load(platform, hosts, start, end).free_windows(start, end) if start < end else []
+        return JsonResponse({
+            'code': 200,
+            'platform': platform,
+            'data': [{'start': x[0].strftime('%Y-%m-%d %H:%M'), 'end': x[1].strftime('%Y-%m-%d %H:%M')}
+                     for x in windows]
+        })
 
 
 class CancelMeetingView(GenericAPIView, UpdateModelMixin):
@@ -474,50 +602,20 @@ class CancelMeetingView(GenericAPIView, UpdateModelMixin):
     def put(self, *args, **kwargs):
         user_id = self.request.user.id
         mid = self.kwargs.get('mmid')
-        access = refresh_access(self.request.user)
-        if not Meeting.objects.filter(mid=mid, user_id=user_id, is_delete=0) and User.objects.get(id=user_id).level != 3:
+        access = refresh_access(self.request)
+        if not Meeting.objects.filter(mid=mid, user_id=user_id, is_delete=0) and self.request.user.level != 3:
             return JsonResponse({'code': 400, 'msg': '会议不存在', 'access': access})
-        status = drivers.cancelMeeting(mid)
-        meeting = Meeting.objects.get(mid=mid)
-        # 数据库更改Meeting的is_delete=1
-        if status == 200:
-            # 发送删除通知邮件
-            from meetings.utils.send_cancel_email import sendmail
-            sendmail(mid)
-
-            Meeting.objects.filter(mid=mid).update(is_delete=1)
-            # 发送会议取消通知
-            collections = Collect.objects.filter(meeting_id=meeting.id)
-            if collections:
-                access_token = wx_apis.get_token()
-                topic = meeting.topic
-                date = meeting.date
-                start_time = meeting.start
-                time = date + ' ' + start_time
-                for collection in collections:
-                    user_id = collection.user_id
-                    user = User.objects.get(id=user_id)
-                    nickname = user.nickname
-                    openid = user.openid
-                    content = wx_apis.get_remove_template(openid, topic, time, mid)
-                    r = wx_apis.send_subscription(content, access_token)
-                    if r.status_code != 200:
-                        logger.error('status code: {}'.format(r.status_code))
-                        logger.error('content: {}'.format(r.json()))
-                    else:
-                        if r.json()['errcode'] != 0:
-                            logger.warning('Error Code: {}'.format(r.json()['errcode']))
-                            logger.warning('Error Msg: {}'.format(r.json()['errmsg']))
-                            logger.warning('receiver: {}'.format(nickname))
-                        else:
-                            logger.info('meeting {} cancel message sent to {}.'.format(mid, nickname))
-                    # 删除收藏
-                    collection.delete()
+        meeting = Meeting.objects.filter(mid=mid, is_delete=0).first()
+        if not meeting:
+            return JsonResponse({'code': 400, 'msg': '会议不存在', 'access': access})
+        job = submit_job(meeting, JOB_CANCEL)
+        if job.status == JOB_SUCCEEDED:
             logger.info('{} has canceled the meeting which mid was {}'.format(self.request.user.gitee_name, mid))
             return JsonResponse({'code': 200, 'msg': '取消会议', 'access': access})
-        else:
-            logger.error('删除会议失败')
+        if job.status == JOB_FAILED:
             return JsonResponse({'code': 400, 'msg': '取消失败', 'access': access})
+        logger.info('{} has requested to cancel the meeting which mid is {}'.format(self.request.user.gitee_name, mid))
+        return JsonResponse({'code': 202, 'msg': '会议取消中', 'job_id': job.id, 'access': access})
 
     def get_remove_template(self, openid, topic, time, mid):
         if len(topic) > 20:
@@ -560,20 +658,119 @@ class CancelMeetingView(GenericAPIView, UpdateModelMixin):
             sys.exit(1)
 
 
+class BulkCancelMeetingView(GenericAPIView):
+    """管理员按条件批量取消会议"""
+    queryset = Meeting.objects.filter(is_delete=0).exclude(mid='')
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (AdminPermission,)
+
+    def post(self, request, *args, **kwargs):
+        data = self.request.data
+        group_name = data.get('group_name')
+        host_id = data.get('host_id')
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        access = refresh_access(self.request)
+        if not group_name and not host_id:
+            return JsonResponse({'code': 400, 'msg': 'group_name与host_id不能同时为空', 'access': access})
+        try:
+            for date in (start_date, end_date):
+                if date:
+                    datetime.datetime.strptime(date, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return JsonResponse({'code': 400, 'msg': 'start_date与end_date的格式应为YYYY-MM-DD', 'access': access})
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        queryset = self.get_queryset().filter(date__gte=max(start_date or today, today))
+        if end_date:
+            queryset = queryset.filter(date__lte=end_date)
+        if group_name:
+            queryset = queryset.filter(group_name=group_name)
+        if host_id:
+            queryset = queryset.filter(host_id=host_id)
+        cancelled, failed = cancel_meetings(queryset)
+        logger.info('{} has canceled {} meetings in bulk, {} failed'.format(self.request.user.gitee_name,
+                                                                         len(cancelled), len(failed)))
+        return JsonResponse({
+            'code': 200 if not failed else 400,
+            'msg': '取消会议' if not failed else '部分会议取消失败',
+            'cancelled': [meeting.mid for meeting in cancelled],
+            'failed': [meeting.mid for meeting in failed],
+            'access': access
+        })
+
+
+class MeetingJobView(GenericAPIView, RetrieveModelMixin):
+    """会议预定/取消任务状态"""
+    queryset = MeetingJob.objects.all()
+    authentication_classes = (CustomAuthentication,)
+    permission_classes = (MaintainerPermission,)
+
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        meeting = Meeting.objects.get(id=job.meeting_id)
+        return JsonResponse({
+            'code': 200,
+            'job_id': job.id,
+            'action': job.get_action_display(),
+            'status': JOB_STATUS_NAMES[job.status],
+            'attempts': job.attempts,
+            'error': job.error,
+            'meeting': {
+                'id': meeting.id,
+                'mid': meeting.mid,
+                'mmid': meeting.mmid,
+                'join_url': meeting.join_url
+            }
+        })
+
+    def get_queryset(self):
+        queryset = MeetingJob.objects.filter(meeting__user_id=self.request.user.id)
+        if self.request.user.level == 3:
+            queryset = MeetingJob.objects.all()
+        return queryset
+
+
 class MeetingDetailView(GenericAPIView, RetrieveModelMixin):
     """会议详情"""
     serializer_class = MeetingsListSerializer
-    queryset = Meeting.objects.filter(is_delete=0)
+    # mid为空的会议尚未在第三方平台创建成功，不对外展示
+    queryset = Meeting.objects.filter(is_delete=0).exclude(mid='')
 
     def get(self, request, *args, **kwargs):
         return self.retrieve(request, *args, **kwargs)
 
 
-class MeetingsListView(GenericAPIView, ListModelMixin):
-    """会议列表"""
+class MeetingOverviewView(GenericAPIView, RetrieveModelMixin):
+    """会议详情聚合：会议、当前用户的收藏、录像下载地址及缓存的参会人数，会议相关数据一次查询获取"""
     serializer_class = MeetingsListSerializer
-    queryset = Meeting.objects.filter(is_delete=0)
+    queryset = Meeting.objects.filter(is_delete=0).exclude(mid='')
+
+    def get_queryset(self):
+        records = Record.objects.filter(meeting_code=OuterRef('mid')).order_by('-id')
+        queryset = self.queryset.annotate(download_url=Subquery(records.values('download_url')[:1]))
+        user = self.request.user
+        if user.is_authenticated:
+            collections = Collect.objects.filter(meeting_id=OuterRef('pk'), user_id=user.pk)
+            queryset = queryset.annotate(user_collection_id=Subquery(collections.values('id')[:1]))
+        return queryset
 
+    def get(self, request, *args, **kwargs):
+        meeting = self.get_object()
+        context = self.get_serializer_context()
+        context['collection_ids'] = {meeting.id: getattr(meeting, 'user_collection_id', None)}
+        data = self.get_serializer_class()(meeting, context=context).data
+        data['download_url'] = meeting.download_url
+        data['participants'] = participants.get_cached_participants(meeting.mid)
+        return Response(data)
+
+
+class MeetingsListView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
+    """会议列表，支持按组、城市、平台、发起人及日期范围筛选"""
+    serializer_class = MeetingsListSerializer
+    queryset = Meeting.objects.filter(is_delete=0).exclude(mid='')
+    pagination_class = MeetingCursorPagination
+
+    @conditional(resource_version.MEETINGS, resource_version.LIVE)
     def get(self, request, *args, **kwargs):
         today = datetime.datetime.strftime(datetime.datetime.today(), '%Y-%m-%d')
         meeting_range = self.request.GET.get('range')
@@ -596,7 +793,18 @@ class MeetingsListView(GenericAPIView, ListModelMixin):
                                                                                                               'start')
         if meeting_range == 'recently':
             self.queryset = self.queryset.filter(date__gte=today).order_by('date', 'start')
-        return self.list(request, *args, **kwargs)
+        try:
+            self.queryset = meeting_filters.filter_meetings(self.queryset, self.request.GET)
+        except ValueError as e:
+            return JsonResponse({'code': 400, 'msg': str(e)})
+        response = self.list(request, *args, **kwargs)
+        # counts=true时同时返回筛选结果的总数及按组、城市、平台的数量
+        if self.request.GET.get('counts', '').lower() == 'true':
+            total, counts = meeting_filters.count_meetings(self.filter_queryset(self.get_queryset()))
+            if isinstance(response.data, list):
+                response.data = {'results': response.data}
+            response.data.update({'count': total, 'counts': counts})
+        return response
 
 
 class CollectMeetingView(GenericAPIView, CreateModelMixin):
@@ -609,11 +817,12 @@ class CollectMeetingView(GenericAPIView, CreateModelMixin):
     def post(self, request, *args, **kwargs):
         user_id = self.request.user.id
         meeting_id = self.request.data['meeting']
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         if not meeting_id:
             return JsonResponse({'code': 400, 'msg': 'meeting不能为空', 'access': access})
         if not Collect.objects.filter(meeting_id=meeting_id, user_id=user_id):
             Collect.objects.create(meeting_id=meeting_id, user_id=user_id)
+            resource_version.bump(resource_version.MEETINGS)
         collection_id = Collect.objects.get(meeting_id=meeting_id, user_id=user_id).id
         return JsonResponse({'code': 201, 'msg': '收藏成功', 'collection_id': collection_id, 'access':
             access})
@@ -631,8 +840,10 @@ class CollectionDelView(GenericAPIView, DestroyModelMixin):
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
+        sync.record_deletions(sync.COLLECTIONS, [(instance.id, instance.user_id)])
         self.perform_destroy(instance)
-        access = refresh_access(self.request.user)
+        resource_version.bump(resource_version.MEETINGS)
+        access = refresh_access(self.request)
         response = Response()
         response.data = {'access': access}
         response.status = status.HTTP_204_NO_CONTENT
@@ -643,10 +854,11 @@ class CollectionDelView(GenericAPIView, DestroyModelMixin):
         return queryset
 
 
-class MyMeetingsView(GenericAPIView, ListModelMixin):
+class MyMeetingsView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """我预定的所有会议"""
     serializer_class = MeetingsListSerializer
-    queryset = Meeting.objects.all().filter(is_delete=0)
+    queryset = Meeting.objects.filter(is_delete=0).exclude(mid='')
+    pagination_class = MeetingCursorPagination
     permission_classes = (permissions.IsAuthenticated,)
     authentication_classes = (authentication.JWTAuthentication,)
 
@@ -655,16 +867,17 @@ class MyMeetingsView(GenericAPIView, ListModelMixin):
 
     def get_queryset(self):
         user_id = self.request.user.id
-        queryset = Meeting.objects.filter(is_delete=0, user_id=user_id).order_by('-date', 'start')
-        if User.objects.get(id=user_id).level == 3:
-            queryset = Meeting.objects.filter(is_delete=0).order_by('-date', 'start')
+        queryset = self.queryset.filter(user_id=user_id).order_by('-date', 'start')
+        if self.request.user.level == 3:
+            queryset = self.queryset.order_by('-date', 'start')
         return queryset
 
 
-class MyCollectionsView(GenericAPIView, ListModelMixin):
+class MyCollectionsView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """我收藏的会议"""
     serializer_class = MeetingsListSerializer
     queryset = Meeting.objects.all()
+    pagination_class = MeetingCursorPagination
     permission_classes = (permissions.IsAuthenticated,)
     authentication_classes = (authentication.JWTAuthentication,)
 
@@ -674,7 +887,7 @@ class MyCollectionsView(GenericAPIView, ListModelMixin):
     def get_queryset(self):
         user_id = self.request.user.id
         collection_lst = Collect.objects.filter(user_id=user_id).values_list('meeting', flat=True)
-        queryset = Meeting.objects.filter(is_delete=0, id__in=collection_lst).order_by('-date', 'start')
+        queryset = Meeting.objects.filter(is_delete=0, id__in=collection_lst).exclude(mid='').order_by('-date', 'start')
         return queryset
 
 
@@ -687,7 +900,7 @@ class FeedbackView(GenericAPIView, CreateModelMixin):
 
     def post(self, request, *args, **kwargs):
         data = self.request.data
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         try:
             feedback_type = data['feedback_type']
             feedback_content = data['feedback_content']
@@ -714,16 +927,24 @@ class FeedbackView(GenericAPIView, CreateModelMixin):
 
 
 class HandleRecordView(GenericAPIView):
-    """处理录像"""
+    """处理腾讯会议回调：录像完成后上传OBS，会议开始、结束及成员入会事件更新会议状态"""
 
     def get(self, request, *args, **kwargs):
         check_str = self.request.GET.get('check_str')
+        if not webhook_events.check_signature(self.request.META, check_str):
+            return HttpResponse('invalid signature', status=403)
         return HttpResponse(base64.b64decode(check_str.encode('utf-8')).decode('utf-8'))
 
     def post(self, request, *args, **kwargs):
         data = self.request.data
         bdata = data['data']
+        if not webhook_events.check_signature(self.request.META, bdata):
+            logger.warning('HandleRecord: invalid signature')
+            return HttpResponse('invalid signature', status=403)
         real_data = json.loads(base64.b64decode(bdata.encode('utf-8')).decode('utf-8'))
+        # 会议开始、结束及成员入会事件只更新会议状态
+        if webhook_events.ingest(real_data):
+            return HttpResponse('successfully received callback')
         logger.info('completed recording payload: {}'.format(real_data))
         # 从real_data从获取会议的id, code, record_file_id
         try:
@@ -799,9 +1020,9 @@ class HandleRecordView(GenericAPIView):
                 # 发送包含download_url的邮件
                 from meetings.utils.send_recording_completed_msg import sendmail
                 topic = meeting.topic
-                date = meeting.date
-                start = meeting.start
-                end = meeting.end
+                date = meeting.date.strftime('%Y-%m-%d')
+                start = meeting.start.strftime('%H:%M')
+                end = meeting.end.strftime('%H:%M')
                 sendmail(topic, group_name, date, start, end, meeting_code, obs_download_url)
                 Record.objects.create(meeting_code=meeting_code, file_size=file_size, download_url=obs_download_url)
                 try:
@@ -816,15 +1037,23 @@ class HandleRecordView(GenericAPIView):
 
 
 class ParticipantsView(GenericAPIView):
-    """会议参会者信息"""
+    """会议参会者信息，会议结束后名单保存到数据库，之后的查询不再调用第三方平台"""
     permission_classes = (QueryPermission,)
 
     def get(self, request, *args, **kwargs):
         mid = self.kwargs.get('mid')
-        if not Meeting.objects.filter(mid=mid, is_delete=0):
+        records = ParticipantRecord.objects.filter(mid=OuterRef('mid'))
+        meeting = Meeting.objects.filter(mid=mid, is_delete=0).annotate(
+            participants_data=Subquery(records.values('data')[:1])).first()
+        if not meeting:
             return JsonResponse({'code': 400, 'msg': 'Bad Request'})
+        # 已结束会议的名单直接从数据库返回
+        if meeting.participants_data:
+            return JsonResponse(json.loads(meeting.participants_data))
         status, res = drivers.getParticipants(mid)
         if status == 200:
+            participants.cache_participants(mid, res)
+            participants.save_participants(meeting, res)
             return JsonResponse(res)
         resp = JsonResponse(res)
         resp.status_code = 400
@@ -866,8 +1095,10 @@ class SponsorsAddView(GenericAPIView, CreateModelMixin):
     def post(self, request, *args, **kwargs):
         ids = self.request.data.get('ids')
         ids_list = [int(x) for x in ids.split('-')]
-        User.objects.filter(id__in=ids_list, activity_level=1).update(activity_level=2)
-        access = refresh_access(self.request.user)
+        User.objects.filter(id__in=ids_list, activity_level=1).update(activity_level=2,
+                                                                      perm_version=F('perm_version') + 1)
+        invalidate_principals(*ids_list)
+        access = refresh_access(self.request)
         return JsonResponse({'code': 201, 'msg': '添加成功', 'access': access})
 
 
@@ -878,10 +1109,12 @@ class SponsorsDelView(GenericAPIView, CreateModelMixin):
     permission_classes = (ActivityAdminPermission,)
 
     def post(self, request, *args, **kwargs):
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         ids = self.request.data.get('ids')
         ids_list = [int(x) for x in ids.split('-')]
-        User.objects.filter(id__in=ids_list, activity_level=2).update(activity_level=1)
+        User.objects.filter(id__in=ids_list, activity_level=2).update(activity_level=1,
+                                                                      perm_version=F('perm_version') + 1)
+        invalidate_principals(*ids_list)
         return JsonResponse({'code': 204, 'msg': '删除成功', 'access': access})
 
 
@@ -892,9 +1125,10 @@ class ActivityCreateView(GenericAPIView, CreateModelMixin):
     authentication_classes = (CustomAuthentication,)
     permission_classes = (SponsorPermission,)
 
+    @idempotent
     def post(self, request, *args, **kwargs):
         data = self.request.data
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         title = data['title']
         start_date = data['start_date']
         end_date = data['end_date']
@@ -974,13 +1208,15 @@ class ActivityUpdateView(GenericAPIView, UpdateModelMixin):
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
+        start_date = instance.start_date
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
+        calendars.invalidate_activity_calendar(start_date, instance.start_date)
 
         if getattr(instance, '_prefetched_objects_cache', None):
             instance._prefetched_objects_cache = {}
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         data = serializer.data
         data['access'] = access
         response = Response()
@@ -988,8 +1224,7 @@ class ActivityUpdateView(GenericAPIView, UpdateModelMixin):
         return response
 
     def get_queryset(self):
-        user_id = self.request.user.id
-        activity_level = User.objects.get(id=user_id).activity_level
+        activity_level = self.request.user.activity_level
         queryset = Activity.objects.filter(is_delete=0, status__in=[3, 4, 5], user_id=self.request.user.id)
         if activity_level == 3:
             queryset = Activity.objects.filter(is_delete=0, status__in=[3, 4, 5])
@@ -1004,7 +1239,7 @@ class DraftUpdateView(GenericAPIView, UpdateModelMixin):
     permission_classes = (SponsorPermission,)
 
     def put(self, request, *args, **kwargs):
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         activity_id = self.kwargs.get('pk')
         data = self.request.data
         title = data['title']
@@ -1046,7 +1281,8 @@ class DraftUpdateView(GenericAPIView, UpdateModelMixin):
                 synopsis=synopsis,
                 schedules=json.dumps(schedules),
                 poster=poster,
-                status=2
+                status=2,
+                update_time=datetime.datetime.now()
             )
             return JsonResponse({'code': 201, 'msg': '修改活动草案并申请发布成功！', 'access': access})
         # 修改活动草案并保存
@@ -1066,11 +1302,12 @@ class DraftUpdateView(GenericAPIView, UpdateModelMixin):
             synopsis=synopsis,
             schedules=json.dumps(schedules),
             poster=poster,
+            update_time=datetime.datetime.now()
         )
         return JsonResponse({'code': 201, 'msg': '修改并保存活动草案', 'access': access})
 
 
-class WaitingActivities(GenericAPIView, ListModelMixin):
+class WaitingActivities(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """待审活动列表"""
     serializer_class = ActivitiesSerializer
     queryset = Activity.objects.filter(is_delete=0, status=2)
@@ -1099,13 +1336,16 @@ class ApproveActivityView(GenericAPIView, UpdateModelMixin):
     permission_classes = (ActivityAdminPermission,)
 
     def put(self, request, *args, **kwargs):
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         activity_id = self.kwargs.get('pk')
         if activity_id in self.queryset.values_list('id', flat=True):
             logger.info('活动id: {}'.format(activity_id))
             img_url = gene_wx_code.run(activity_id)
             logger.info('生成活动页面二维码: {}'.format(img_url))
-            Activity.objects.filter(id=activity_id, status=2).update(status=3, wx_code=img_url)
+            Activity.objects.filter(id=activity_id, status=2).update(status=3, wx_code=img_url,
+                                                                     update_time=datetime.datetime.now())
+            calendars.invalidate_activity_calendar(
+                *Activity.objects.filter(id=activity_id).values_list('start_date', flat=True))
             return JsonResponse({'code': 201, 'msg': '活动通过审核', 'access': access})
         else:
             return JsonResponse({'code': 400, 'msg': '活动不存在', 'access': access})
@@ -1118,10 +1358,10 @@ class DenyActivityView(GenericAPIView, UpdateModelMixin):
     permission_classes = (ActivityAdminPermission,)
 
     def put(self, request, *args, **kwargs):
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         activity_id = self.kwargs.get('pk')
         if activity_id in self.queryset.values_list('id', flat=True):
-            Activity.objects.filter(id=activity_id, status=2).update(status=1)
+            Activity.objects.filter(id=activity_id, status=2).update(status=1, update_time=datetime.datetime.now())
             return JsonResponse({'code': 201, 'msg': '活动申请已驳回', 'access': access})
         else:
             return JsonResponse({'code': 400, 'msg': '活动不存在', 'access': access})
@@ -1134,9 +1374,11 @@ class ActivityDeleteView(GenericAPIView, UpdateModelMixin):
     permission_classes = (ActivityAdminPermission,)
 
     def put(self, request, *args, **kwargs):
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         activity_id = self.kwargs.get('pk')
-        Activity.objects.filter(id=activity_id).update(is_delete=1)
+        Activity.objects.filter(id=activity_id).update(is_delete=1, update_time=datetime.datetime.now())
+        calendars.invalidate_activity_calendar(
+            *Activity.objects.filter(id=activity_id).values_list('start_date', flat=True))
         return JsonResponse({'code': 204, 'msg': '成功删除活动', 'access': access})
 
 
@@ -1156,7 +1398,7 @@ class DraftView(GenericAPIView, RetrieveModelMixin, DestroyModelMixin):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         response = Response()
         response.data = {'access': access}
         response.status = status.HTTP_204_NO_CONTENT
@@ -1168,11 +1410,13 @@ class DraftView(GenericAPIView, RetrieveModelMixin, DestroyModelMixin):
         return queryset
 
 
-class ActivitiesListView(GenericAPIView, ListModelMixin):
+class ActivitiesListView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """活动列表"""
     serializer_class = ActivitiesSerializer
     queryset = Activity.objects.filter(is_delete=0, status__gt=2).order_by('-start_date', 'id')
+    pagination_class = ActivityCursorPagination
 
+    @conditional(resource_version.ACTIVITIES)
     def get(self, request, *args, **kwargs):
         activity_status = self.request.GET.get('activity_status')
         activity_category = self.request.GET.get('activity_category')
@@ -1197,10 +1441,11 @@ class ActivitiesListView(GenericAPIView, ListModelMixin):
         return self.list(request, *args, **kwargs)
 
 
-class RecentActivitiesView(GenericAPIView, ListModelMixin):
+class RecentActivitiesView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """最近的活动列表"""
     serializer_class = ActivitiesSerializer
     queryset = Activity.objects.filter(is_delete=0)
+    pagination_class = ActivityCursorPagination
 
     def get(self, request, *args, **kwargs):
         self.queryset = self.queryset.filter(status__gt=2, start_date__gte=datetime.datetime.now(). \
@@ -1217,7 +1462,7 @@ class ActivityDetailView(GenericAPIView, RetrieveModelMixin):
         return self.retrieve(request, *args, **kwargs)
 
 
-class DraftsListView(GenericAPIView, ListModelMixin):
+class DraftsListView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """活动草案列表(草稿箱)"""
     serializer_class = ActivitiesSerializer
     queryset = Activity.objects.all()
@@ -1233,10 +1478,11 @@ class DraftsListView(GenericAPIView, ListModelMixin):
         return queryset
 
 
-class PublishedActivitiesView(GenericAPIView, ListModelMixin):
+class PublishedActivitiesView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """我发布的活动列表(已发布)"""
     serializer_class = ActivitiesSerializer
     queryset = Activity.objects.all()
+    pagination_class = ActivityCursorPagination
     authentication_classes = (authentication.JWTAuthentication,)
     permission_classes = (SponsorPermission,)
 
@@ -1250,7 +1496,7 @@ class PublishedActivitiesView(GenericAPIView, ListModelMixin):
         return queryset
 
 
-class WaitingPublishingActivitiesView(GenericAPIView, ListModelMixin):
+class WaitingPublishingActivitiesView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """待发布的活动列表(待发布)"""
     serializer_class = ActivitiesSerializer
     queryset = Activity.objects.all()
@@ -1276,14 +1522,16 @@ class ActivityCollectView(GenericAPIView, CreateModelMixin):
         user_id = self.request.user.id
         activity_id = self.request.data['activity']
         ActivityCollect.objects.create(activity_id=activity_id, user_id=user_id)
-        access = refresh_access(self.request.user)
+        resource_version.bump(resource_version.ACTIVITIES)
+        access = refresh_access(self.request)
         return JsonResponse({'code': 201, 'msg': '收藏活动', 'access': access})
 
 
-class ActivityCollectionsView(GenericAPIView, ListModelMixin):
+class ActivityCollectionsView(SparseFieldsMixin, GenericAPIView, ListModelMixin):
     """收藏活动列表"""
     serializer_class = ActivitiesSerializer
     queryset = Activity.objects.all()
+    pagination_class = ActivityCursorPagination
     permission_classes = (permissions.IsAuthenticated,)
     authentication_classes = (authentication.JWTAuthentication,)
 
@@ -1309,8 +1557,10 @@ class ActivityCollectionDelView(GenericAPIView, DestroyModelMixin):
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
+        sync.record_deletions(sync.ACTIVITY_COLLECTIONS, [(instance.id, instance.user_id)])
         self.perform_destroy(instance)
-        access = refresh_access(self.request.user)
+        resource_version.bump(resource_version.ACTIVITIES)
+        access = refresh_access(self.request)
         response = Response()
         response.data = {'access': access}
         response.status = status.HTTP_204_NO_CONTENT
@@ -1372,17 +1622,17 @@ class MyCountsView(GenericAPIView, ListModelMixin):
 
         # shared
         collected_meetings_count = len(Meeting.objects.filter(is_delete=0, id__in=(
-            Collect.objects.filter(user_id=user_id).values_list('meeting_id', flat=True))).values())
+            Collect.objects.filter(user_id=user_id).values_list('meeting_id', flat=True))).exclude(mid='').values())
         collected_activities_count = len(Activity.objects.filter(is_delete=0, id__in=(
             ActivityCollect.objects.filter(user_id=user_id).values_list('activity_id', flat=True))).values())
         res = {'collected_meetings_count': collected_meetings_count,
                'collected_activities_count': collected_activities_count}
         # permission limited
         if level == 2:
-            created_meetings_count = len(Meeting.objects.filter(is_delete=0, user_id=user_id).values())
+            created_meetings_count = len(Meeting.objects.filter(is_delete=0, user_id=user_id).exclude(mid='').values())
             res['created_meetings_count'] = created_meetings_count
         if level == 3:
-            created_meetings_count = len(Meeting.objects.filter(is_delete=0).values())
+            created_meetings_count = len(Meeting.objects.filter(is_delete=0).exclude(mid='').values())
             res['created_meetings_count'] = created_meetings_count
         if activity_level == 2:
             published_activities_count = len(
@@ -1404,89 +1654,95 @@ class MyCountsView(GenericAPIView, ListModelMixin):
 
 class MeetingsDataView(GenericAPIView, ListModelMixin):
     """会议日历数据"""
-    queryset = Meeting.objects.filter(is_delete=0).order_by('start')
+    queryset = Meeting.objects.filter(is_delete=0).exclude(mid='').order_by('start')
 
+    @conditional(resource_version.MEETINGS)
     def get(self, request, *args, **kwargs):
-        self.queryset = self.queryset.filter(
-            date__gte=(datetime.datetime.now() - datetime.timedelta(days=180)).strftime('%Y-%m-%d'),
-            date__lte=(datetime.datetime.now() + datetime.timedelta(days=180)).strftime('%Y-%m-%d'))
-        queryset = self.filter_queryset(self.get_queryset()).values()
-        tableData = []
-        date_list = []
-        for query in queryset:
-            date_list.append(query.get('date'))
-        date_list = sorted(list(set(date_list)))
-        for date in date_list:
-            tableData.append(
-                {
-                    'date': date,
-                    'timeData': [{
-                        'id': meeting.id,
-                        'group_name': meeting.group_name,
-                        'meeting_type': meeting.meeting_type,
-                        'city': meeting.city,
-                        'startTime': meeting.start,
-                        'endTime': meeting.end,
-                        'duration': math.ceil(float(meeting.end.replace(':', '.'))) - math.floor(
-                            float(meeting.start.replace(':', '.'))),
-                        'duration_time': meeting.start.split(':')[0] + ':00' + '-' + str(
-                            math.ceil(float(meeting.end.replace(':', '.')))) + ':00',
-                        'name': meeting.topic,
-                        'creator': meeting.sponsor,
-                        'detail': meeting.agenda,
-                        'url': User.objects.get(id=meeting.user_id).avatar,
-                        'join_url': meeting.join_url,
-                        'meeting_id': meeting.mid,
-                        'etherpad': meeting.etherpad,
-                        'replay_url': meeting.replay_url,
-                        'platform': meeting.mplatform
-                    } for meeting in Meeting.objects.filter(is_delete=0, date=date)]
-                })
-        return Response({'tableData': tableData})
+        try:
+            start_date, end_date = calendars.get_window(self.request.GET)
+        except ValueError as e:
+            return JsonResponse({'code': 400, 'msg': str(e)})
+        return Response({'tableData': calendars.get_meeting_calendar(start_date, end_date)})
 
 
 class ActivitiesDataView(GenericAPIView, ListModelMixin):
     """活动日历数据"""
     queryset = Activity.objects.filter(is_delete=0, status__in=[3, 4, 5])
 
+    @conditional(resource_version.ACTIVITIES)
     def get(self, request, *args, **kwargs):
-        self.queryset = self.queryset.filter(
-            start_date__gte=(datetime.datetime.now() - datetime.timedelta(days=180)).strftime('%Y-%m-%d'),
-            start_date__lte=(datetime.datetime.now() + datetime.timedelta(days=180)).strftime('%Y-%m-%d'))
-        queryset = self.filter_queryset(self.get_queryset()).values()
-        tableData = []
-        date_list = []
-        for query in queryset:
-            date_list.append(query.get('start_date'))
-        date_list = sorted(list(set(date_list)))
-        for start_date in date_list:
-            tableData.append(
-                {
-                    'start_date': start_date,
-                    'timeData': [{
-                        'id': activity.id,
-                        'title': activity.title,
-                        'start_date': activity.start_date,
-                        'end_date': activity.end_date,
-                        'activity_category': activity.activity_category,
-                        'activity_type': activity.activity_type,
-                        'address': activity.address,
-                        'detail_address': activity.detail_address,
-                        'longitude': activity.longitude,
-                        'latitude': activity.latitude,
-                        'register_method': activity.register_method,
-                        'online_url': activity.online_url,
-                        'register_url': activity.register_url,
-                        'synopsis': activity.synopsis,
-                        'sign_url': activity.sign_url,
-                        'replay_url': activity.replay_url,
-                        'poster': activity.poster,
-                        'wx_code': activity.wx_code,
-                        'schedules': json.loads(activity.schedules)
-                    } for activity in Activity.objects.filter(is_delete=0, start_date=start_date)]
-                }
-            )
-        return Response({'tableData': tableData})
+        try:
+            start_date, end_date = calendars.get_window(self.request.GET)
+        except ValueError as e:
+            return JsonResponse({'code': 400, 'msg': str(e)})
+        return Response({'tableData': calendars.get_activity_calendar(start_date, end_date)})
+
+
+class ChangesView(GenericAPIView, ListModelMixin):
+    """会议、活动及当前用户收藏的增量同步，返回游标之后新增、修改与删除的记录"""
+    queryset = Meeting.objects.all()
+
+    def get(self, request, *args, **kwargs):
+        try:
+            changes, cursor, has_more = sync.get_sync(self.request.user, self.request.GET.get('cursor'),
+                                                      settings.SYNC_PAGE_SIZE)
+        except sync.CursorExpired:
+            return JsonResponse({'code': 410, 'msg': '同步游标已过期，请不带游标重新同步'})
+        except ValueError:
+            return JsonResponse({'code': 400, 'msg': '无效的同步游标'})
+        context = self.get_serializer_context()
+        meetings = changes['meetings']
+        activities = changes['activities']
+        res = {
+            'code': 200,
+            'cursor': cursor,
+            'has_more': has_more,
+            'meetings': {
+                'updated': MeetingsListSerializer([x for x in meetings if not x.is_delete], many=True,
+                                                  context=context).data,
+                'deleted': [x.id for x in meetings if x.is_delete]
+            },
+            'activities': {
+                'updated': ActivitiesSerializer([x for x in activities if not x.is_delete and x.status > 2],
+                                                many=True, context=context).data,
+                'deleted': [x.id for x in activities if x.is_delete or x.status <= 2]
+            }
+        }
+        for name, key in ((sync.COLLECTIONS, 'meeting'), (sync.ACTIVITY_COLLECTIONS, 'activity')):
+            res[name] = {
+                'updated': [{'id': x.id, key: getattr(x, key + '_id')} for x in changes.get(name, [])],
+                'deleted': [x.object_id for x in changes.get(name + '_deleted', [])]
+            }
+        return Response(res)
+
+
+class GroupFeedView(GenericAPIView, RetrieveModelMixin):
+    """组会议订阅日历"""
+    queryset = Group.objects.all()
+
+    @conditional(resource_version.MEETINGS, resource_version.GROUPS)
+    def get(self, request, *args, **kwargs):
+        group = self.get_object()
+        return feeds.feed_response(feeds.get_group_feed(group), 'group-{}.ics'.format(group.id))
+
+
+class CityFeedView(GenericAPIView, RetrieveModelMixin):
+    """城市MSG会议订阅日历"""
+    queryset = City.objects.all()
+
+    @conditional(resource_version.MEETINGS, resource_version.CITIES)
+    def get(self, request, *args, **kwargs):
+        city = self.get_object()
+        return feeds.feed_response(feeds.get_city_feed(city), 'city-{}.ics'.format(city.id))
+
+
+class ActivityFeedView(GenericAPIView, ListModelMixin):
+    """已发布活动订阅日历"""
+    queryset = Activity.objects.filter(is_delete=0, status__in=[3, 4, 5])
+
+    @conditional(resource_version.ACTIVITIES)
+    def get(self, request, *args, **kwargs):
+        return feeds.feed_response(feeds.get_activity_feed(), 'activities.ics')
 
 
 class AgreePrivacyPolicyView(GenericAPIView, UpdateModelMixin):
@@ -1495,7 +1751,7 @@ class AgreePrivacyPolicyView(GenericAPIView, UpdateModelMixin):
 
     def put(self, request, *args, **kwargs):
         now_time = datetime.datetime.now()
-        access = refresh_access(self.request.user)
+        access = refresh_access(self.request)
         if User.objects.get(id=self.request.user.id).agree_privacy_policy:
             resp = JsonResponse({
                 'code': 400,
@@ -80,6 +80,7 @@ CORS_ALLOW_HEADERS = (
     'x-csrftoken',
     'x-requested-with',
     'Pragma',
+    'Idempotency-Key',
 )
 CORS_ALLOW_CREDENTIALS = True
 
@@ -103,7 +104,11 @@ ROOT_URLCONF = 'mindspore_meetings.urls'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (  # 认证方式
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # 请求携带cursor或page_size参数时按游标分页
+    'DEFAULT_PAGINATION_CLASS': 'meetings.pagination.OptInCursorPagination',
+    # 会议起止时间按HH:MM输出，与改为时间类型前保持一致
+    'TIME_FORMAT': '%H:%M'
 }
 
 SIMPLE_JWT = {
@@ -130,6 +135,31 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': datetime.timedelta(days=1),
 }
 
+# 多worker部署时应配置共享缓存(如memcached)，否则缓存失效只在当前进程生效
+CACHES = {
+    'default': {
+        'BACKEND': DEFAULT_CONF.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': DEFAULT_CONF.get('CACHE_LOCATION', 'mindspore-meetings'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': DEFAULT_CONF.get('CACHE_MAX_ENTRIES', 10000)
+        }
+    }
+}
+
+# access token剩余有效期小于该值时才轮换
+ACCESS_TOKEN_ROTATE_BEFORE = datetime.timedelta(minutes=DEFAULT_CONF.get('ACCESS_TOKEN_ROTATE_BEFORE', 1440))
+
+# 已认证用户缓存时长(秒)，以用户id为键，CACHE_BACKEND为进程内缓存时不启用
+PRINCIPAL_CACHE_TIMEOUT = DEFAULT_CONF.get('PRINCIPAL_CACHE_TIMEOUT', 300)
+
+# 日历按月缓存的时长(秒)，缓存键包含资源版本号，会议、活动变更后即不再命中
+CALENDAR_CACHE_TIMEOUT = DEFAULT_CONF.get('CALENDAR_CACHE_TIMEOUT', 3600)
+# 参会人数缓存时长(秒)，查询参会者名单时刷新
+PARTICIPANTS_CACHE_TIMEOUT = DEFAULT_CONF.get('PARTICIPANTS_CACHE_TIMEOUT', 7 * 24 * 3600)
+# 未收到会议结束事件时，会议结束时间之后多久(分钟)视为已结束并保存参会者名单
+PARTICIPANTS_FINAL_DELAY = DEFAULT_CONF.get('PARTICIPANTS_FINAL_DELAY', 120)
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -186,6 +216,28 @@ TX_MEETING_APPID = DEFAULT_CONF.get('TX_MEETING_APPID', '')
 TX_MEETING_SDKID = DEFAULT_CONF.get('TX_MEETING_SDKID', '')
 TX_MEETING_SECRETKEY = DEFAULT_CONF.get('TX_MEETING_SECRETKEY', '')
 TX_MEETING_SECRETID = DEFAULT_CONF.get('TX_MEETING_SECRETID')
+# 腾讯会议webhook的token，用于校验回调签名；未配置时不处理会议开始、结束及成员入会事件
+TX_MEETING_WEBHOOK_TOKEN = DEFAULT_CONF.get('TX_MEETING_WEBHOOK_TOKEN', '')
+
+# 为True时预定、取消会议由provisionmeetings进程异步调用第三方平台
+MEETING_PROVISION_ASYNC = DEFAULT_CONF.get('MEETING_PROVISION_ASYNC', False)
+MEETING_JOB_MAX_ATTEMPTS = DEFAULT_CONF.get('MEETING_JOB_MAX_ATTEMPTS', 3)
+# 同步创建系列会议时调用第三方平台的最大并发数
+MEETING_PROVISION_CONCURRENCY = DEFAULT_CONF.get('MEETING_PROVISION_CONCURRENCY', 4)
+# 空闲时段查询的最大日期跨度(天)
+AVAILABILITY_MAX_DAYS = DEFAULT_CONF.get('AVAILABILITY_MAX_DAYS', 31)
+# 幂等键的有效期(小时)，有效期内重复的请求直接返回首次请求的结果
+IDEMPOTENCY_KEY_TTL = DEFAULT_CONF.get('IDEMPOTENCY_KEY_TTL', 24)
+# 幂等键处理中状态的租期(秒)，应大于uwsgi的harakiri，超时未完成的请求可以重试
+IDEMPOTENCY_KEY_LEASE = DEFAULT_CONF.get('IDEMPOTENCY_KEY_LEASE', 60)
+# 增量同步每类数据单次返回的最大条数
+SYNC_PAGE_SIZE = DEFAULT_CONF.get('SYNC_PAGE_SIZE', 200)
+# 增量同步游标相对当前时间的回退(秒)，覆盖同步期间尚未提交的写入
+SYNC_CURSOR_LAG = DEFAULT_CONF.get('SYNC_CURSOR_LAG', 5)
+# 删除记录的保留天数，更早的同步游标需重新全量同步
+SYNC_TOMBSTONE_DAYS = DEFAULT_CONF.get('SYNC_TOMBSTONE_DAYS', 30)
+# 会议事件回调去重记录的保留天数，覆盖第三方平台的重试周期
+MEETING_EVENT_DAYS = DEFAULT_CONF.get('MEETING_EVENT_DAYS', 7)
 
 MINDSPORE_MEETING_ATTENTION_TEMPLATE = DEFAULT_CONF.get('MINDSPORE_MEETING_ATTENTION_TEMPLATE', '')
 MINDSPORE_CANCEL_MEETING_TEMPLATE = DEFAULT_CONF.get('MINDSPORE_CANCEL_MEETING_TEMPLATE', '')